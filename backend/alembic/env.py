@@ -24,6 +24,11 @@ if db_url:
 # Import Base and all models so autogenerate can detect them
 from app.database import Base  # noqa: E402
 import app.models.weather_query  # noqa: F401
+import app.models.geocode_cache  # noqa: F401
+import app.models.weather_observation  # noqa: F401
+import app.models.media_cache  # noqa: F401
+import app.models.weather_query_hourly  # noqa: F401
+import app.models.table_version  # noqa: F401
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,27 @@
+"""add weather_queries pagination and lookup indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_weather_queries_created_at_id", "weather_queries", ["created_at", "id"])
+    op.create_index("ix_weather_queries_resolved_location", "weather_queries", ["resolved_location"])
+    op.create_index("ix_weather_queries_latitude_longitude", "weather_queries", ["latitude", "longitude"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weather_queries_latitude_longitude", table_name="weather_queries")
+    op.drop_index("ix_weather_queries_resolved_location", table_name="weather_queries")
+    op.drop_index("ix_weather_queries_created_at_id", table_name="weather_queries")
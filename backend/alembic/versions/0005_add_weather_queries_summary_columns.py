@@ -0,0 +1,51 @@
+"""add weather_queries summary columns
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _series(key: str) -> str:
+    return (
+        f"jsonb_array_elements_text(CASE WHEN jsonb_typeof(weather_data->'daily'->'{key}') = 'array' "
+        f"THEN weather_data->'daily'->'{key}' ELSE '[]'::jsonb END)"
+    )
+
+
+def upgrade() -> None:
+    op.add_column("weather_queries", sa.Column("temp_min", sa.Float(), nullable=True))
+    op.add_column("weather_queries", sa.Column("temp_max", sa.Float(), nullable=True))
+    op.add_column("weather_queries", sa.Column("precipitation_total", sa.Float(), nullable=True))
+    op.add_column(
+        "weather_queries",
+        sa.Column("day_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+    )
+    op.execute(
+        f"""
+        UPDATE weather_queries SET
+            temp_max = (SELECT max(v::float) FROM {_series("temperature_2m_max")} AS v),
+            temp_min = (SELECT min(v::float) FROM {_series("temperature_2m_min")} AS v),
+            precipitation_total = (
+                SELECT round(sum(v::numeric), 2)::float FROM {_series("precipitation_sum")} AS v
+            ),
+            day_count = (SELECT count(*) FROM {_series("time")} AS v)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("weather_queries", "day_count")
+    op.drop_column("weather_queries", "precipitation_total")
+    op.drop_column("weather_queries", "temp_max")
+    op.drop_column("weather_queries", "temp_min")
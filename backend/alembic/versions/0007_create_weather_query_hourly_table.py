@@ -0,0 +1,36 @@
+"""create weather_query_hourly table
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weather_query_hourly",
+        sa.Column("query_id", sa.Integer(), nullable=False),
+        sa.Column("variable", sa.String(length=64), nullable=False),
+        sa.Column("unit", sa.String(length=16), nullable=True),
+        sa.Column("encoding", sa.String(length=32), nullable=False),
+        sa.Column("start_ts", sa.BigInteger(), nullable=False),
+        sa.Column("step_seconds", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["query_id"], ["weather_queries.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("query_id", "variable"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("weather_query_hourly")
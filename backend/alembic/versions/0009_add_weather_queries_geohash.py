@@ -0,0 +1,73 @@
+"""add weather_queries geohash column and prefix index
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BACKFILL_CHUNK = 1000
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _encode(lat: float, lon: float, precision: int = 9) -> str:
+    # Frozen copy of app.services.geohash.encode, so re-running this migration always
+    # writes the same values whatever happens to the application module
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            value = value << 1 | (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            value = value << 1 | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def upgrade() -> None:
+    op.add_column("weather_queries", sa.Column("geohash", sa.String(length=12), nullable=True))
+    conn = op.get_bind()
+    select_page = sa.text(
+        "SELECT id, latitude, longitude FROM weather_queries"
+        " WHERE id > :after AND latitude IS NOT NULL AND longitude IS NOT NULL"
+        " ORDER BY id LIMIT :limit"
+    )
+    update = sa.text("UPDATE weather_queries SET geohash = :geohash WHERE id = :id")
+    after = 0
+    while True:
+        rows = conn.execute(select_page, {"after": after, "limit": _BACKFILL_CHUNK}).all()
+        if not rows:
+            break
+        conn.execute(
+            update,
+            [{"id": row.id, "geohash": _encode(float(row.latitude), float(row.longitude))} for row in rows],
+        )
+        after = rows[-1].id
+    op.create_index(
+        "ix_weather_queries_geohash",
+        "weather_queries",
+        ["geohash"],
+        postgresql_ops={"geohash": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weather_queries_geohash", table_name="weather_queries")
+    op.drop_column("weather_queries", "geohash")
@@ -0,0 +1,57 @@
+"""re-key weather_observations from 2-decimal rounding onto the 0.1 degree grid
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# OPEN_METEO_GRID_DEGREES when stored days switched to grid-snapped keys (0009)
+_GRID_DEGREES = 0.1
+
+
+def _snap(value) -> float:
+    # Frozen copy of app.services.open_meteo.snap_to_grid for one coordinate
+    return round(round(float(value) / _GRID_DEGREES) * _GRID_DEGREES, 6)
+
+
+def upgrade() -> None:
+    """
+    Move each day stored under a 2-decimal coordinate pair to its grid cell, keeping the
+    most recently fetched copy where several old pairs (or an existing grid row) collide.
+    """
+    conn = op.get_bind()
+    pairs = conn.execute(sa.text("SELECT DISTINCT latitude, longitude FROM weather_observations")).all()
+    move = sa.text(
+        """
+        INSERT INTO weather_observations (latitude, longitude, day, data, meta, fetched_at)
+        SELECT :grid_lat, :grid_lon, day, data, meta, fetched_at
+        FROM weather_observations
+        WHERE latitude = :lat AND longitude = :lon
+        ON CONFLICT (latitude, longitude, day) DO UPDATE
+            SET data = EXCLUDED.data, meta = EXCLUDED.meta, fetched_at = EXCLUDED.fetched_at
+            WHERE weather_observations.fetched_at < EXCLUDED.fetched_at
+        """
+    )
+    remove = sa.text("DELETE FROM weather_observations WHERE latitude = :lat AND longitude = :lon")
+    for lat, lon in pairs:
+        grid_lat, grid_lon = _snap(lat), _snap(lon)
+        if (grid_lat, grid_lon) == (float(lat), float(lon)):
+            continue
+        params = {"lat": lat, "lon": lon, "grid_lat": grid_lat, "grid_lon": grid_lon}
+        conn.execute(move, params)
+        conn.execute(remove, params)
+
+
+def downgrade() -> None:
+    # The original 2-decimal keys are not recoverable; grid-keyed rows stay valid
+    pass
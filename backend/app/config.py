@@ -12,5 +12,94 @@ class Settings(BaseSettings):
     UNSPLASH_ACCESS_KEY: str = ""
     CORS_ORIGINS: str = "http://localhost:3000"
 
+    # Upstream endpoints; override to point the app at local stubs (see benchmarks/)
+    OPEN_METEO_ARCHIVE_URL: str = "https://archive-api.open-meteo.com/v1/archive"
+    OPEN_METEO_FORECAST_URL: str = "https://api.open-meteo.com/v1/forecast"
+    OPENWEATHER_BASE_URL: str = "https://api.openweathermap.org/data/2.5"
+    UNSPLASH_SEARCH_URL: str = "https://api.unsplash.com/search/photos"
+    YOUTUBE_SEARCH_URL: str = "https://www.googleapis.com/youtube/v3/search"
+    GEMINI_BASE_URL: str = ""
+
+    # Resolved-location cache: in-process LRU in front of the geocode_cache table
+    GEOCODE_CACHE_MAX_ENTRIES: int = 10_000
+    GEOCODE_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    GEOCODE_CACHE_DB_TTL_SECONDS: int = 30 * 24 * 60 * 60
+
+    # Shared outbound HTTP clients (one pool per upstream service)
+    HTTP2_ENABLED: bool = False
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_POOL_TIMEOUT: float = 5.0
+    OPEN_METEO_TIMEOUT: float = 30.0
+    OPENWEATHER_TIMEOUT: float = 10.0
+    UNSPLASH_TIMEOUT: float = 10.0
+    YOUTUBE_TIMEOUT: float = 10.0
+
+    # Outbound resilience: hedge a slow GET after the given latency percentile, and
+    # open a per-upstream circuit when the windowed error rate crosses the threshold
+    HEDGE_ENABLED: bool = True
+    HEDGE_PERCENTILE: float = 95.0
+    HEDGE_MIN_DELAY_MS: int = 50
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_LATENCY_SAMPLES: int = 200
+    HEDGE_MAX_RATIO: float = 0.1
+    # Comma-separated upstreams that may be hedged: idempotent and not billed per call
+    # (YouTube, Unsplash and OpenWeatherMap spend API quota on every request)
+    HEDGE_UPSTREAMS: str = "open_meteo"
+    BREAKER_WINDOW_SECONDS: float = 30.0
+    BREAKER_MIN_REQUESTS: int = 10
+    BREAKER_ERROR_RATE: float = 0.5
+    BREAKER_OPEN_SECONDS: float = 15.0
+    RESILIENCE_FALLBACK_MAX_ENTRIES: int = 500
+    # Oldest last-good response that may stand in for a failing upstream
+    RESILIENCE_FALLBACK_MAX_AGE_SECONDS: int = 10 * 60
+
+    # Open-Meteo model grid spacing; coordinates are snapped to it before fetching/caching
+    OPEN_METEO_GRID_DEGREES: float = 0.1
+    # Saved queries within this distance whose range covers a new query donate its data (0 disables)
+    WEATHER_REUSE_RADIUS_KM: float = 5.0
+
+    # Per-day Open-Meteo response cache
+    WEATHER_DAY_CACHE_MAX_ENTRIES: int = 100_000
+    WEATHER_FORECAST_CACHE_TTL_SECONDS: int = 30 * 60
+    # Point requests arriving within this window are sent as one multi-location call (0 disables)
+    OPEN_METEO_BATCH_WINDOW_MS: int = 15
+    OPEN_METEO_BATCH_MAX_LOCATIONS: int = 50
+
+    # Background export rendering
+    EXPORT_ARTIFACT_DIR: str = "export_artifacts"
+    EXPORT_WORKERS: int = 2
+
+    # YouTube/Unsplash results: fresh for the TTL, then served stale while refreshing
+    MEDIA_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    MEDIA_CACHE_STALE_SECONDS: int = 30 * 24 * 60 * 60
+    MEDIA_CACHE_MAX_ENTRIES: int = 2_000
+
+    # Background re-fetch of the forecast tail of saved queries (0 disables)
+    FORECAST_REFRESH_INTERVAL_SECONDS: int = 60 * 60
+    FORECAST_REFRESH_BATCH_SIZE: int = 200
+
+    # Max concurrent location lookups / weather fetches per batch request
+    BATCH_CONCURRENCY: int = 8
+
+    # Cache-Control max-age for live weather, so a CDN can absorb repeat lookups
+    WEATHER_CURRENT_MAX_AGE_SECONDS: int = 60
+    WEATHER_FORECAST_MAX_AGE_SECONDS: int = 10 * 60
+
+    # Negotiated br/zstd/gzip for responses at least this large (brotli/zstandard are optional)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Compressed bodies of ETagged responses, reused until the content version changes
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 256
+    COMPRESSION_CACHE_MAX_ENTRY_BYTES: int = 4 * 1024 * 1024
+    COMPRESSION_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Add a Server-Timing header (db, upstream, geocode, total) to every response
+    SERVER_TIMING_ENABLED: bool = False
+
+    # Per-section timeout for /api/location/bundle
+    BUNDLE_SECTION_TIMEOUT: float = 8.0
+
 
 settings = Settings()
@@ -1,11 +1,36 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from app.routers import weather, queries, media, export
+from app.routers import weather, queries, media, export, location
 from app.config import settings
+from app.database import engine
+from app.services import export_jobs, forecast_refresher, http_clients, metrics, open_meteo
+from app.services.compression import CompressionMiddleware
+
+logger = logging.getLogger(__name__)
+
+metrics.instrument_engine(engine)
+
 
-app = FastAPI(title="Weather App API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_clients.startup()
+    forecast_refresher.start()
+    try:
+        yield
+    finally:
+        await forecast_refresher.stop()
+        await open_meteo.shutdown()
+        await http_clients.shutdown()
+        export_jobs.shutdown()
+
+
+app = FastAPI(title="Weather App API", version="1.0.0", lifespan=lifespan)
 
 # Parse CORS origins from env, always include common dev/prod origins
 cors_origins = [o.strip() for o in settings.CORS_ORIGINS.split(",") if o.strip()]
@@ -21,22 +46,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Stale-Upstreams"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+
+def _route_label(request: Request) -> str:
+    # The route template keeps label cardinality bounded (/api/queries/{query_id})
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    token = metrics.start_request_timing()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        timings = metrics.finish_request_timing(token)
+        route = _route_label(request)
+        metrics.HTTP_REQUESTS.inc(method=request.method, route=route, status=status)
+        metrics.HTTP_DURATION.observe(elapsed, method=request.method, route=route)
+    if settings.SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed)
+    return response
+
 
 app.include_router(weather.router, prefix="/api")
 app.include_router(queries.router, prefix="/api")
 app.include_router(media.router, prefix="/api")
 app.include_router(export.router, prefix="/api")
+app.include_router(location.router, prefix="/api")
 
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
+    logger.error("Unhandled error on %s %s", request.method, request.url.path, exc_info=exc)
+    metrics.UNHANDLED_ERRORS.inc(route=_route_label(request), exception=type(exc).__name__)
     return JSONResponse(
         status_code=500,
         content={"detail": "An unexpected server error occurred. Please try again later."},
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
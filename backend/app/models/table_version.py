@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import String, BigInteger, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TableVersion(Base):
+    """Write counter per table, bumped by a statement-level trigger (see migrations 0008, 0010)."""
+
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = mapped_column(String(63), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
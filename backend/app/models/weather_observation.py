@@ -0,0 +1,23 @@
+from datetime import date, datetime
+from sqlalchemy import Date, Numeric, DateTime, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class WeatherObservation(Base):
+    """One day of Open-Meteo daily values for a grid-snapped coordinate pair."""
+
+    __tablename__ = "weather_observations"
+
+    latitude: Mapped[float] = mapped_column(Numeric(9, 6), primary_key=True)
+    longitude: Mapped[float] = mapped_column(Numeric(9, 6), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    meta: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -1,5 +1,5 @@
 from datetime import date, datetime, timezone
-from sqlalchemy import String, Date, Numeric, DateTime, func, text
+from sqlalchemy import String, Date, Numeric, DateTime, Float, Integer, Index, func, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -8,15 +8,28 @@ from app.database import Base
 
 class WeatherQuery(Base):
     __tablename__ = "weather_queries"
+    __table_args__ = (
+        Index("ix_weather_queries_created_at_id", "created_at", "id"),
+        Index("ix_weather_queries_resolved_location", "resolved_location"),
+        Index("ix_weather_queries_latitude_longitude", "latitude", "longitude"),
+        # Prefix (LIKE 'abc%') lookups for nearest-neighbour reuse
+        Index("ix_weather_queries_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     location: Mapped[str] = mapped_column(String(255), nullable=False)
     resolved_location: Mapped[str | None] = mapped_column(String(255), nullable=True)
     latitude: Mapped[float | None] = mapped_column(Numeric(9, 6), nullable=True)
     longitude: Mapped[float | None] = mapped_column(Numeric(9, 6), nullable=True)
+    geohash: Mapped[str | None] = mapped_column(String(12), nullable=True)
     start_date: Mapped[date] = mapped_column(Date, nullable=False)
     end_date: Mapped[date] = mapped_column(Date, nullable=False)
     weather_data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Aggregates of weather_data, written alongside it so listings can skip the JSONB
+    temp_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    temp_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+    precipitation_total: Mapped[float | None] = mapped_column(Float, nullable=True)
+    day_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class WeatherQueryHourly(Base):
+    """One compressed hourly series (see app.services.columnar) for a saved query."""
+
+    __tablename__ = "weather_query_hourly"
+
+    query_id: Mapped[int] = mapped_column(
+        ForeignKey("weather_queries.id", ondelete="CASCADE"), primary_key=True
+    )
+    variable: Mapped[str] = mapped_column(String(64), primary_key=True)
+    unit: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    encoding: Mapped[str] = mapped_column(String(32), nullable=False)
+    start_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    step_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
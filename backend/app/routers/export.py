@@ -1,62 +1,148 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import Response
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
 from app.models.weather_query import WeatherQuery
-from app.services.exporter import to_json, to_csv, to_xml, to_pdf, to_markdown
+from app.schemas.export_job import ExportJobResponse
+from app.services import compression, conditional, export_jobs
+from app.services.exporter import STREAM_FORMATS, record_to_dict, stream_records
+from app.services.table_versions import get_version
 
 router = APIRouter(prefix="/export", tags=["export"])
 
-EXPORTERS = {
-    "json": (to_json, "weather_queries.json"),
-    "csv": (to_csv, "weather_queries.csv"),
-    "xml": (to_xml, "weather_queries.xml"),
-    "pdf": (to_pdf, "weather_queries.pdf"),
-    "markdown": (to_markdown, "weather_queries.md"),
+FILENAMES = {
+    "json": "weather_queries.json",
+    "csv": "weather_queries.csv",
+    "xml": "weather_queries.xml",
+    "pdf": "weather_queries.pdf",
+    "markdown": "weather_queries.md",
 }
 
+MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "xml": "application/xml",
+    "pdf": "application/pdf",
+    "markdown": "text/markdown",
+}
+
+# Rows fetched per round trip from the server-side cursor
+STREAM_BATCH_SIZE = 500
+
+# Renders of a pool-rendered export before giving up on data that keeps changing
+RENDER_ATTEMPTS = 3
+
+
+def _check_format(format: str) -> None:
+    if format not in FILENAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}'. Choose from: {', '.join(FILENAMES)}",
+        )
+
+
+def _download_headers(format: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{FILENAMES[format]}"'}
+
+
+def _job_response(job: dict, request: Request) -> ExportJobResponse:
+    download_url = None
+    if job["status"] == "done":
+        download_url = str(request.url_for("download_export_job", job_id=job["id"]))
+    return ExportJobResponse(**job, download_url=download_url)
+
+
+async def _stream_export(format: str):
+    """
+    Encode the export from a server-side cursor in its own session. The row count
+    (for formats that print it) and the rows come from one REPEATABLE READ snapshot,
+    so a concurrent write cannot make them disagree.
+    """
+    stmt = (
+        select(*WeatherQuery.__table__.columns)
+        .order_by(WeatherQuery.created_at.desc())
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    async with AsyncSessionLocal() as session:
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        total = None
+        if STREAM_FORMATS[format].needs_total:
+            total = await session.scalar(select(func.count()).select_from(WeatherQuery))
+        result = await session.stream(stmt)
+        records = (record_to_dict(row) async for row in result)
+        async for chunk in stream_records(format, records, total):
+            yield chunk
+
 
 @router.get("/")
 async def export_data(
+    request: Request,
     format: str = Query(..., description="Export format: json | csv | xml | pdf | markdown"),
     db: AsyncSession = Depends(get_db),
 ):
-    if format not in EXPORTERS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported format '{format}'. Choose from: {', '.join(EXPORTERS)}",
+    _check_format(format)
+    version, last_modified = await get_version(db)
+    etag = conditional.make_etag("export", format, version)
+    if (not_modified := conditional.not_modified(request, etag, last_modified)) is not None:
+        return not_modified
+    if (cached := compression.cached_response(request, etag)) is not None:
+        return cached
+    headers = {**_download_headers(format), **conditional.validators(etag, last_modified)}
+
+    if format in STREAM_FORMATS:
+        return StreamingResponse(
+            _stream_export(format),
+            media_type=STREAM_FORMATS[format].media_type,
+            headers=headers,
         )
 
-    result = await db.execute(select(WeatherQuery).order_by(WeatherQuery.created_at.desc()))
-    records = result.scalars().all()
-
-    # Serialize ORM objects to plain dicts
-    record_dicts = [
-        {
-            "id": r.id,
-            "location": r.location,
-            "resolved_location": r.resolved_location,
-            "latitude": float(r.latitude) if r.latitude is not None else None,
-            "longitude": float(r.longitude) if r.longitude is not None else None,
-            "start_date": r.start_date,
-            "end_date": r.end_date,
-            "weather_data": r.weather_data,
-            "created_at": r.created_at,
-            "updated_at": r.updated_at,
-        }
-        for r in records
-    ]
-
-    exporter_fn, filename = EXPORTERS[format]
-    try:
-        content, media_type = exporter_fn(record_dicts)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Export failed: {e}")
-
-    return Response(
-        content=content,
-        media_type=media_type,
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    # Layout-heavy formats render in the export process pool, off the event loop. If an
+    # export of newer data prunes this one while it is awaited, follow the newer data
+    for _ in range(RENDER_ATTEMPTS):
+        job = await export_jobs.wait((await export_jobs.submit(format, db))["id"])
+        if job is not None and job["status"] == "failed":
+            raise HTTPException(status_code=500, detail=f"Export failed: {job['error']}")
+        if job is not None and export_jobs.artifact_path(job["id"]).exists():
+            return FileResponse(
+                export_jobs.artifact_path(job["id"]),
+                media_type=MEDIA_TYPES[format],
+                headers=headers,
+            )
+        version, last_modified = await get_version(db)
+        etag = conditional.make_etag("export", format, version)
+        headers = {**_download_headers(format), **conditional.validators(etag, last_modified)}
+    raise HTTPException(status_code=503, detail="Export superseded by newer data; try again")
+
+
+@router.post("/jobs", response_model=ExportJobResponse, status_code=202)
+async def create_export_job(
+    request: Request,
+    format: str = Query(..., description="Export format: json | csv | xml | pdf | markdown"),
+    db: AsyncSession = Depends(get_db),
+):
+    _check_format(format)
+    job = await export_jobs.submit(format, db)
+    return _job_response(job, request)
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(job_id: str, request: Request):
+    job = export_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return _job_response(job, request)
+
+
+@router.get("/jobs/{job_id}/download", name="download_export_job")
+async def download_export_job(job_id: str):
+    job = export_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    path = export_jobs.artifact_path(job_id)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Export artifact expired; create a new job")
+    return FileResponse(path, media_type=MEDIA_TYPES[job["format"]], headers=_download_headers(job["format"]))
@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.config import settings
+from app.services.location_interpreter import interpret_location
+from app.services.maps import get_map_data
+from app.services.openweather import get_current_weather, get_forecast
+from app.services.unsplash import get_photos
+from app.services.youtube import search_videos
+
+router = APIRouter(prefix="/location", tags=["location"])
+
+
+async def _section(coro) -> tuple[object, str | None]:
+    """Await one bundle section, turning failures and timeouts into an error message."""
+    try:
+        return await asyncio.wait_for(coro, timeout=settings.BUNDLE_SECTION_TIMEOUT), None
+    except asyncio.TimeoutError:
+        return None, "Timed out"
+    except HTTPException as e:
+        return None, e.detail
+    except Exception:
+        return None, "Unexpected error"
+
+
+@router.get("/bundle")
+async def location_bundle(location: str = Query(..., description="City, zip code, coordinates, or natural language")):
+    """
+    Resolve a location once and fetch current weather, forecast, videos, photos and
+    map data concurrently. Sections that fail or time out are returned as null with
+    their message under ``errors``.
+    """
+    geo = await interpret_location(location)
+    lat, lon, name = geo["latitude"], geo["longitude"], geo["resolved_name"]
+
+    sections = {
+        "weather": get_current_weather(lat, lon),
+        "forecast": get_forecast(lat, lon),
+        "videos": search_videos(name),
+        "photos": get_photos(name),
+    }
+    results = await asyncio.gather(*(_section(coro) for coro in sections.values()))
+
+    bundle = {
+        "resolved_location": name,
+        "latitude": lat,
+        "longitude": lon,
+        "map": get_map_data(geo),
+        "errors": {},
+    }
+    for key, (data, error) in zip(sections, results):
+        bundle[key] = data
+        if error is not None:
+            bundle["errors"][key] = error
+    return bundle
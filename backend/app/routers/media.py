@@ -18,7 +18,7 @@ async def youtube_videos(location: str = Query(..., description="Location to sea
 @router.get("/maps")
 async def maps_data(location: str = Query(..., description="Location to get map data for")):
     geo = await interpret_location(location)
-    return await get_map_data(geo["resolved_name"])
+    return get_map_data(geo)
 
 
 @router.get("/photos")
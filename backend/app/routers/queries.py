@@ -1,20 +1,45 @@
-from datetime import datetime, timezone, timedelta
+import asyncio
+import base64
+import json
+from datetime import date, datetime, timezone, timedelta
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import insert, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
 from app.models.weather_query import WeatherQuery
-from app.schemas.weather_query import WeatherQueryCreate, WeatherQueryUpdate, WeatherQueryResponse
+from app.schemas.query_stats import QueryStatsResponse
+from app.schemas.weather_query import (
+    HourlySeriesResponse,
+    WeatherQueryBatchCreate,
+    WeatherQueryBatchItemResult,
+    WeatherQueryBatchResponse,
+    WeatherQueryCreate,
+    WeatherQueryUpdate,
+    WeatherQueryResponse,
+    WeatherQuerySummary,
+)
 from app.services.location_interpreter import interpret_location
-from app.services.open_meteo import get_weather_for_range
+from app.services import compression, conditional, geohash, hourly_store
+from app.services.query_json import RESPONSE_JSON
+from app.services.query_stats import compute_stats
+from app.services.table_versions import get_version
+from app.services.open_meteo import get_hourly_for_range, get_weather_for_range, slice_weather, snap_to_grid
+from app.services.weather_reuse import find_nearby_weather
+from app.services.weather_summary import summarize_weather
 
 router = APIRouter(prefix="/queries", tags=["queries"])
 
 MAX_PAST_YEARS = 5
 MAX_FUTURE_DAYS = 16
 
+SUMMARY_COLUMNS = [
+    getattr(WeatherQuery, name) for name in WeatherQuerySummary.model_fields
+]
+
 
 def _validate_date_range(start_date, end_date):
     today = datetime.now(tz=timezone.utc).date()
@@ -36,48 +61,267 @@ def _validate_date_range(start_date, end_date):
         )
 
 
+def _encode_cursor(record: WeatherQuery) -> str:
+    raw = json.dumps([record.created_at.isoformat(), record.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, record_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
 @router.post("/", response_model=WeatherQueryResponse, status_code=201)
 async def create_query(body: WeatherQueryCreate, db: AsyncSession = Depends(get_db)):
     _validate_date_range(body.start_date, body.end_date)
 
     geo = await interpret_location(body.location)
-    weather_data = await get_weather_for_range(
-        geo["latitude"], geo["longitude"], body.start_date, body.end_date
-    )
+    # A saved query close by that already covers this range saves the upstream call
+    weather_data = await find_nearby_weather(db, geo["latitude"], geo["longitude"], body.start_date, body.end_date)
+    fetches = {}
+    if weather_data is None:
+        fetches["weather"] = get_weather_for_range(geo["latitude"], geo["longitude"], body.start_date, body.end_date)
+    if body.hourly:
+        fetches["hourly"] = get_hourly_for_range(geo["latitude"], geo["longitude"], body.start_date, body.end_date)
+    results = dict(zip(fetches, await asyncio.gather(*fetches.values())))
+    weather_data = results.get("weather", weather_data)
 
     record = WeatherQuery(
         location=body.location,
         resolved_location=geo["resolved_name"],
         latitude=geo["latitude"],
         longitude=geo["longitude"],
+        geohash=geohash.encode(geo["latitude"], geo["longitude"]),
         start_date=body.start_date,
         end_date=body.end_date,
         weather_data=weather_data,
+        **summarize_weather(weather_data),
     )
     db.add(record)
     await db.flush()
+    if "hourly" in results:
+        await hourly_store.replace_series(db, record.id, results["hourly"])
     await db.refresh(record)
     return record
 
 
-@router.get("/", response_model=list[WeatherQueryResponse])
+@router.post("/batch", response_model=WeatherQueryBatchResponse)
+async def create_queries_batch(body: WeatherQueryBatchCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Create many queries at once. Locations are resolved and weather fetched with
+    bounded concurrency; items at the same coordinates share one Open-Meteo range
+    covering all of their dates. Successful items are inserted in a single
+    multi-row INSERT ... RETURNING; each item reports its own success or error.
+    """
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    errors: dict[int, str] = {}
+
+    valid: list[int] = []
+    for i, item in enumerate(body.items):
+        try:
+            _validate_date_range(item.start_date, item.end_date)
+            valid.append(i)
+        except HTTPException as e:
+            errors[i] = e.detail
+
+    async def resolve(location: str) -> dict | HTTPException:
+        async with semaphore:
+            try:
+                return await interpret_location(location)
+            except HTTPException as e:
+                return e
+
+    locations = list({body.items[i].location for i in valid})
+    resolved = dict(zip(locations, await asyncio.gather(*(resolve(loc) for loc in locations))))
+
+    cells: dict[tuple[float, float], list[int]] = {}
+    for i in valid:
+        geo = resolved[body.items[i].location]
+        if isinstance(geo, HTTPException):
+            errors[i] = geo.detail
+        else:
+            cells.setdefault(snap_to_grid(geo["latitude"], geo["longitude"]), []).append(i)
+
+    # Items in the same grid cell whose ranges overlap or touch share one fetch;
+    # disjoint ranges are fetched separately rather than spanning the gap
+    groups: dict[tuple[tuple[float, float], date, date], list[int]] = {}
+    for coords, indexes in cells.items():
+        indexes.sort(key=lambda i: body.items[i].start_date)
+        span: list[int] = []
+        end = None
+        for i in indexes:
+            item = body.items[i]
+            if span and item.start_date > end + timedelta(days=1):
+                groups[(coords, body.items[span[0]].start_date, end)] = span
+                span = []
+            end = item.end_date if not span else max(end, item.end_date)
+            span.append(i)
+        groups[(coords, body.items[span[0]].start_date, end)] = span
+
+    async def fetch(coords: tuple[float, float], start: date, end: date) -> dict | HTTPException:
+        async with semaphore:
+            try:
+                return await get_weather_for_range(coords[0], coords[1], start, end)
+            except HTTPException as e:
+                return e
+
+    fetched = await asyncio.gather(*(fetch(*key) for key in groups))
+
+    rows: list[dict] = []
+    row_indexes: list[int] = []
+    for indexes, weather in zip(groups.values(), fetched):
+        for i in indexes:
+            if isinstance(weather, HTTPException):
+                errors[i] = weather.detail
+                continue
+            item = body.items[i]
+            geo = resolved[item.location]
+            weather_data = slice_weather(weather, item.start_date, item.end_date)
+            rows.append({
+                "location": item.location,
+                "resolved_location": geo["resolved_name"],
+                "latitude": geo["latitude"],
+                "longitude": geo["longitude"],
+                "geohash": geohash.encode(geo["latitude"], geo["longitude"]),
+                "start_date": item.start_date,
+                "end_date": item.end_date,
+                "weather_data": weather_data,
+                **summarize_weather(weather_data),
+            })
+            row_indexes.append(i)
+
+    async def fetch_hourly(i: int) -> dict | HTTPException:
+        item, geo = body.items[i], resolved[body.items[i].location]
+        async with semaphore:
+            try:
+                return await get_hourly_for_range(geo["latitude"], geo["longitude"], item.start_date, item.end_date)
+            except HTTPException as e:
+                return e
+
+    hourly_indexes = [n for n, i in enumerate(row_indexes) if body.items[i].hourly]
+    hourly_payloads = dict(zip(
+        hourly_indexes,
+        await asyncio.gather(*(fetch_hourly(row_indexes[n]) for n in hourly_indexes)),
+    ))
+    for n, payload in list(hourly_payloads.items()):
+        if isinstance(payload, HTTPException):
+            errors[row_indexes[n]] = payload.detail
+            del hourly_payloads[n]
+    keep = [n for n in range(len(rows)) if row_indexes[n] not in errors]
+    rows = [rows[n] for n in keep]
+    hourly_by_row = [hourly_payloads.get(n) for n in keep]
+    row_indexes = [row_indexes[n] for n in keep]
+
+    records = []
+    if rows:
+        stmt = insert(WeatherQuery).returning(WeatherQuery, sort_by_parameter_order=True)
+        records = (await db.scalars(stmt, rows)).all()
+        for record, payload in zip(records, hourly_by_row):
+            if payload is not None:
+                await hourly_store.replace_series(db, record.id, payload)
+
+    results = [
+        WeatherQueryBatchItemResult(index=i, ok=True, record=WeatherQueryResponse.model_validate(r))
+        for i, r in zip(row_indexes, records)
+    ]
+    results += [WeatherQueryBatchItemResult(index=i, ok=False, error=e) for i, e in errors.items()]
+    results.sort(key=lambda r: r.index)
+    return WeatherQueryBatchResponse(created=len(records), failed=len(errors), results=results)
+
+
+@router.get("/", response_model=list[WeatherQueryResponse] | list[WeatherQuerySummary])
 async def list_queries(
-    skip: int = Query(0, ge=0),
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging; ignored when a cursor is given"),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque token from the X-Next-Cursor header"),
+    view: Literal["full", "summary"] = Query(
+        "full", description="'summary' omits weather_data and returns aggregate columns"
+    ),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(WeatherQuery).order_by(WeatherQuery.created_at.desc()).offset(skip).limit(limit)
+    """
+    List saved queries newest first. Pass the X-Next-Cursor value from the previous
+    page as ``cursor`` for keyset pagination on (created_at, id).
+    """
+    version, last_modified = await get_version(db)
+    etag = conditional.make_etag("queries", version, view, skip, limit, cursor)
+    if (not_modified := conditional.not_modified(request, etag, last_modified)) is not None:
+        return not_modified
+    if (cached := compression.cached_response(request, etag)) is not None:
+        return cached
+    response.headers.update(conditional.validators(etag, last_modified))
+
+    if view == "summary":
+        stmt = select(*SUMMARY_COLUMNS)
+    else:
+        stmt = select(WeatherQuery.id, WeatherQuery.created_at, RESPONSE_JSON.label("body"))
+    stmt = stmt.order_by(WeatherQuery.created_at.desc(), WeatherQuery.id.desc())
+    if cursor is not None:
+        stmt = stmt.where(tuple_(WeatherQuery.created_at, WeatherQuery.id) < _decode_cursor(cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    rows = (await db.execute(stmt.limit(limit))).all()
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    if view == "summary":
+        return [WeatherQuerySummary.model_validate(row) for row in rows]
+    return Response(
+        content="[" + ",".join(row.body for row in rows) + "]",
+        media_type="application/json",
+        headers=dict(response.headers),
     )
-    return result.scalars().all()
+
+
+@router.get("/stats", response_model=QueryStatsResponse)
+async def query_stats(
+    period: Literal["day", "week", "month", "year", "all"] = Query("month"),
+    by_location: bool = Query(True, description="Group by resolved location as well as period"),
+    location: str | None = Query(None, description="Case-insensitive substring of the resolved location"),
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Per-location, per-period aggregates of saved weather, computed in the database."""
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=422, detail="start_date must be before or equal to end_date")
+    return await compute_stats(db, period, by_location, location, start_date, end_date)
 
 
 @router.get("/{query_id}", response_model=WeatherQueryResponse)
-async def get_query(query_id: int, db: AsyncSession = Depends(get_db)):
-    record = await db.get(WeatherQuery, query_id)
-    if not record:
+async def get_query(query_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    updated_at = await db.scalar(select(WeatherQuery.updated_at).where(WeatherQuery.id == query_id))
+    if updated_at is None:
         raise HTTPException(status_code=404, detail="Query not found")
-    return record
+    etag = conditional.make_etag("query", query_id, updated_at.isoformat())
+    if (not_modified := conditional.not_modified(request, etag, updated_at)) is not None:
+        return not_modified
+    if (cached := compression.cached_response(request, etag)) is not None:
+        return cached
+
+    body = await db.scalar(select(RESPONSE_JSON).where(WeatherQuery.id == query_id))
+    if body is None:
+        raise HTTPException(status_code=404, detail="Query not found")
+    return Response(content=body, media_type="application/json", headers=conditional.validators(etag, updated_at))
+
+
+@router.get("/{query_id}/hourly", response_model=HourlySeriesResponse)
+async def get_query_hourly(
+    query_id: int,
+    variables: list[str] | None = Query(None, description="Subset of hourly variables to return"),
+    start: datetime | None = Query(None, description="Naive values are UTC"),
+    end: datetime | None = Query(None, description="Naive values are UTC"),
+    max_points: int = Query(1000, ge=10, le=10_000, description="Series longer than this are averaged down"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Decode a query's stored hourly series, optionally windowed and downsampled."""
+    return await hourly_store.load_series(db, query_id, variables, start, end, max_points)
 
 
 @router.put("/{query_id}", response_model=WeatherQueryResponse)
@@ -107,11 +351,19 @@ async def update_query(
         record.resolved_location = geo["resolved_name"]
         record.latitude = geo["latitude"]
         record.longitude = geo["longitude"]
+        record.geohash = geohash.encode(geo["latitude"], geo["longitude"])
 
     if location_changed or dates_changed:
         record.weather_data = await get_weather_for_range(
             float(record.latitude), float(record.longitude), record.start_date, record.end_date
         )
+        for key, value in summarize_weather(record.weather_data).items():
+            setattr(record, key, value)
+        if await hourly_store.has_series(db, record.id):
+            hourly = await get_hourly_for_range(
+                float(record.latitude), float(record.longitude), record.start_date, record.end_date
+            )
+            await hourly_store.replace_series(db, record.id, hourly)
 
     record.updated_at = datetime.now(tz=timezone.utc)
     await db.flush()
@@ -1,15 +1,32 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Response
 
+from app.config import settings
+from app.services import resilience
 from app.services.location_interpreter import interpret_location
 from app.services.openweather import get_current_weather, get_forecast
 
 router = APIRouter(prefix="/weather", tags=["weather"])
 
 
+def _set_cache_headers(response: Response, max_age: int, stale_upstreams: set[str]) -> None:
+    if stale_upstreams:
+        # Built from a fallback while the upstream was failing: say so, and keep it out of caches
+        response.headers["Cache-Control"] = "no-store"
+        response.headers["X-Stale-Upstreams"] = ",".join(sorted(stale_upstreams))
+        return
+    # Shared caches (CDN) may serve it for max_age, then briefly while they revalidate
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+
+
 @router.get("/current")
-async def current_weather(location: str = Query(..., description="City, zip code, coordinates, or natural language")):
+async def current_weather(
+    response: Response,
+    location: str = Query(..., description="City, zip code, coordinates, or natural language"),
+):
     geo = await interpret_location(location)
-    weather = await get_current_weather(geo["latitude"], geo["longitude"])
+    with resilience.track_fallbacks() as stale:
+        weather = await get_current_weather(geo["latitude"], geo["longitude"])
+    _set_cache_headers(response, settings.WEATHER_CURRENT_MAX_AGE_SECONDS, stale)
     return {
         "resolved_location": geo["resolved_name"],
         "latitude": geo["latitude"],
@@ -19,9 +36,14 @@ async def current_weather(location: str = Query(..., description="City, zip code
 
 
 @router.get("/forecast")
-async def forecast(location: str = Query(..., description="City, zip code, coordinates, or natural language")):
+async def forecast(
+    response: Response,
+    location: str = Query(..., description="City, zip code, coordinates, or natural language"),
+):
     geo = await interpret_location(location)
-    forecast_data = await get_forecast(geo["latitude"], geo["longitude"])
+    with resilience.track_fallbacks() as stale:
+        forecast_data = await get_forecast(geo["latitude"], geo["longitude"])
+    _set_cache_headers(response, settings.WEATHER_FORECAST_MAX_AGE_SECONDS, stale)
     return {
         "resolved_location": geo["resolved_name"],
         "latitude": geo["latitude"],
@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class ExportJobResponse(BaseModel):
+    id: str
+    format: str
+    status: Literal["pending", "running", "done", "failed"]
+    error: str | None
+    created_at: datetime | None
+    finished_at: datetime | None
+    download_url: str | None = None
@@ -0,0 +1,20 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class QueryStatsGroup(BaseModel):
+    location: str | None
+    period: date | None
+    queries: int
+    days: int
+    temp_max_mean: float | None
+    temp_min_mean: float | None
+    precipitation_total: float | None
+    weathercode_histogram: dict[str, int]
+
+
+class QueryStatsResponse(BaseModel):
+    version: int
+    period: str
+    groups: list[QueryStatsGroup]
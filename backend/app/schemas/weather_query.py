@@ -1,13 +1,14 @@
 from datetime import date, datetime
 from typing import Any
 
-from pydantic import BaseModel, field_validator, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class WeatherQueryCreate(BaseModel):
     location: str
     start_date: date
     end_date: date
+    hourly: bool = False
 
     @model_validator(mode="after")
     def validate_dates(self):
@@ -31,7 +32,56 @@ class WeatherQueryResponse(BaseModel):
     start_date: date
     end_date: date
     weather_data: dict[str, Any]
+    temp_min: float | None = None
+    temp_max: float | None = None
+    precipitation_total: float | None = None
+    day_count: int = 0
     created_at: datetime
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class WeatherQuerySummary(BaseModel):
+    """List-view projection: scalar columns and precomputed aggregates, no weather_data."""
+
+    id: int
+    location: str
+    resolved_location: str | None
+    latitude: float | None
+    longitude: float | None
+    start_date: date
+    end_date: date
+    temp_min: float | None
+    temp_max: float | None
+    precipitation_total: float | None
+    day_count: int
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class WeatherQueryBatchCreate(BaseModel):
+    items: list[WeatherQueryCreate] = Field(min_length=1, max_length=1000)
+
+
+class WeatherQueryBatchItemResult(BaseModel):
+    index: int
+    ok: bool
+    record: WeatherQueryResponse | None = None
+    error: str | None = None
+
+
+class WeatherQueryBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[WeatherQueryBatchItemResult]
+
+
+class HourlySeriesResponse(BaseModel):
+    query_id: int
+    step_seconds: int
+    time: list[int]
+    units: dict[str, str | None]
+    series: dict[str, list[float | None]]
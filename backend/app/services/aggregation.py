@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+SECONDS_PER_DAY = 86_400
+_EPOCH = date(1970, 1, 1)
+
+
+def _group_percentile(sorted_values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated percentile per group of an array sorted within each group."""
+    pos = starts + (counts - 1) * (q / 100.0)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, starts + counts - 1)
+    frac = pos - lo
+    return sorted_values[lo] * (1 - frac) + sorted_values[hi] * frac
+
+
+def aggregate_by_local_day(
+    timestamps,
+    utc_offset_seconds: int,
+    variables: dict[str, object],
+    percentiles: tuple[float, ...] = (),
+    representative_hour: float = 12.0,
+) -> dict:
+    """
+    Group time-series samples by local calendar day.
+
+    ``timestamps`` are Unix seconds; ``utc_offset_seconds`` shifts them to local time.
+    Returns the ISO day labels, sample counts per day, the index of each day's
+    representative sample (closest to ``representative_hour`` local time) and, per
+    variable, min/max/mean plus any requested percentiles (as ``p<q>``).
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    if ts.size == 0:
+        return {"days": [], "counts": np.zeros(0, dtype=np.intp), "representative": np.zeros(0, dtype=np.intp), "stats": {}}
+
+    local = ts + int(utc_offset_seconds)
+    order = np.argsort(local, kind="stable")
+    local = local[order]
+    day_number = local // SECONDS_PER_DAY
+    day_values, starts, counts = np.unique(day_number, return_index=True, return_counts=True)
+    group = np.repeat(np.arange(day_values.size), counts)
+
+    # Representative sample: smallest distance to the target local hour within each day
+    distance = np.abs(local - day_number * SECONDS_PER_DAY - representative_hour * 3600)
+    by_distance = np.lexsort((distance, group))
+    representative = order[by_distance[starts]]
+
+    stats = {}
+    for name, raw in variables.items():
+        values = np.asarray(raw, dtype=np.float64)[order]
+        var_stats = {
+            "min": np.minimum.reduceat(values, starts),
+            "max": np.maximum.reduceat(values, starts),
+            "mean": np.add.reduceat(values, starts) / counts,
+        }
+        if percentiles:
+            sorted_values = values[np.lexsort((values, group))]
+            for q in percentiles:
+                var_stats[f"p{q:g}"] = _group_percentile(sorted_values, starts, counts, q)
+        stats[name] = var_stats
+
+    days = [(_EPOCH + timedelta(days=int(d))).isoformat() for d in day_values]
+    return {"days": days, "counts": counts, "representative": representative, "stats": stats}
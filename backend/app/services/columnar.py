@@ -0,0 +1,35 @@
+import zlib
+
+import numpy as np
+
+ENCODING = "f32-shuffle-zlib"
+
+
+def encode_series(values) -> bytes:
+    """
+    Pack a numeric series as float32 (missing values become NaN), byte-shuffled so
+    the exponent bytes of neighbouring samples sit together, then zlib-compressed.
+    """
+    arr = np.asarray([np.nan if v is None else v for v in values], dtype="<f4")
+    shuffled = arr.view(np.uint8).reshape(-1, 4).T.tobytes()
+    return zlib.compress(shuffled, 6)
+
+
+def decode_series(blob: bytes, count: int) -> np.ndarray:
+    raw = np.frombuffer(zlib.decompress(blob), dtype=np.uint8)
+    return raw.reshape(4, count).T.copy().view("<f4").reshape(count)
+
+
+def downsample(values: np.ndarray, max_points: int) -> tuple[np.ndarray, int]:
+    """Average consecutive samples into at most ``max_points`` buckets; returns (values, factor)."""
+    if values.size <= max_points:
+        return values, 1
+    factor = -(-values.size // max_points)
+    padded = np.full(factor * -(-values.size // factor), np.nan, dtype=values.dtype)
+    padded[: values.size] = values
+    buckets = padded.reshape(-1, factor)
+    with np.errstate(invalid="ignore"):
+        counts = np.sum(~np.isnan(buckets), axis=1)
+        sums = np.nansum(buckets, axis=1)
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    return means.astype(values.dtype), factor
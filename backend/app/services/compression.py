@@ -0,0 +1,272 @@
+"""
+Negotiated response compression (br, zstd, gzip) and a cache of compressed bodies.
+
+brotli and zstandard are optional: without them only gzip is offered. Bodies of
+responses that carry a strong ETag are kept compressed under (ETag, encoding), so an
+endpoint that can compute its ETag cheaply returns the cached bytes via
+``cached_response`` without loading or compressing the payload again.
+"""
+import zlib
+from typing import Callable
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.services import metrics
+from app.services.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 6
+
+# Media types worth compressing; PDFs and images are already compressed
+_TEXT_TYPES = ("application/json", "application/xml", "application/javascript")
+
+# Headers describing the body, replayed from the cache; per-request ones (CORS, timing,
+# and Vary, which CORS extends) are added again on the way out
+_ENTITY_HEADERS = {
+    b"content-type",
+    b"content-disposition",
+    b"content-encoding",
+    b"etag",
+    b"last-modified",
+    b"cache-control",
+    b"x-next-cursor",
+}
+
+COMPRESSED_BYTES = metrics.register(
+    metrics.Counter(
+        "http_compression_bytes_total", "Response bytes before and after compression.", ("encoding", "stage")
+    )
+)
+
+# (strong ETag, encoding) -> (entity headers, compressed body), LRU within a total byte budget
+_cache = TTLCache(
+    max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+    ttl=None,
+    max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+    sizeof=lambda entry: len(entry[1]),
+)
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _encoders() -> dict[str, Callable]:
+    """Available encoders in server preference order."""
+    encoders = {}
+    if brotli is not None:
+        encoders["br"] = _Brotli
+    if zstandard is not None:
+        encoders["zstd"] = lambda: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    encoders["gzip"] = lambda: zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return encoders
+
+
+ENCODERS = _encoders()
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Pick the supported encoding with the highest q-value, ties broken by ENCODERS order."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in ENCODERS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def _compressible(content_type: str | None) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in _TEXT_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def cached_response(request: Request, etag: str) -> Response | None:
+    """The compressed body stored for this ETag in the client's preferred encoding, if any."""
+    encoding = negotiate(request.headers.get("accept-encoding"))
+    if encoding is None:
+        return None
+    entry = _cache.get((etag, encoding))
+    if entry is None:
+        return None
+    headers, body = entry
+    response = Response(content=body)
+    response.raw_headers = [
+        *headers,
+        (b"vary", b"Accept-Encoding"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    return response
+
+
+def stats() -> dict:
+    return _cache.stats()
+
+
+class CompressionMiddleware:
+    """Compress response bodies of at least ``minimum_size`` bytes, streaming ones included."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self.app, encoding, self.minimum_size, request_headers.get("if-none-match"))
+        await responder(scope, receive, send)
+
+
+def _add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+
+def _names_strong(if_none_match: str | None, etag: str) -> bool:
+    return bool(if_none_match) and any(tag.strip() == etag for tag in if_none_match.split(","))
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int, if_none_match: str | None = None):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.if_none_match = if_none_match
+        self.send: Send | None = None
+        self.start: Message | None = None
+        self.compressor = None
+        self.passthrough = False
+        self.original_size = 0
+        self.compressed_size = 0
+        # Compressed chunks kept for the cache until they outgrow an entry
+        self.cache_key: tuple[str, str] | None = None
+        self.chunks: list[bytes] | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            if message["status"] == 304:
+                self._weaken_not_modified(MutableHeaders(raw=message["headers"]))
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            if (
+                "content-encoding" in headers
+                or not _compressible(headers.get("content-type"))
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self._begin(headers)
+            if not more_body:
+                # Whole body at once: send it with a real Content-Length
+                data = self.compressor.compress(body) + self.compressor.flush()
+                self._finish(body, data)
+                headers["Content-Length"] = str(len(data))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": data})
+                return
+            await self.send(self.start)
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+        self._finish(body, data, final=not more_body)
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _weaken_not_modified(self, headers: MutableHeaders) -> None:
+        """
+        Give a 304 the weak ETag the compressed 200 carried, unless the client revalidated
+        with the strong tag itself (its copy is the identity body: small or not compressible).
+        """
+        etag = headers.get("etag")
+        if etag and etag.startswith('"') and not _names_strong(self.if_none_match, etag):
+            headers["ETag"] = "W/" + etag
+            _add_vary(headers)
+
+    def _begin(self, headers: MutableHeaders) -> None:
+        self.compressor = ENCODERS[self.encoding]()
+        etag = headers.get("etag")
+        if etag and etag.startswith('"') and self.start["status"] == 200:
+            self.cache_key = (etag, self.encoding)
+            self.chunks = []
+            # The encoded body differs byte-wise from the identity one
+            headers["ETag"] = "W/" + etag
+        headers["Content-Encoding"] = self.encoding
+        _add_vary(headers)
+        del headers["Content-Length"]
+
+    def _finish(self, original: bytes, data: bytes, final: bool = True) -> None:
+        self.original_size += len(original)
+        self.compressed_size += len(data)
+        if self.chunks is not None:
+            self.chunks.append(data)
+            if self.compressed_size > settings.COMPRESSION_CACHE_MAX_ENTRY_BYTES:
+                self.chunks = None
+        if not final:
+            return
+        COMPRESSED_BYTES.inc(self.original_size, encoding=self.encoding, stage="original")
+        COMPRESSED_BYTES.inc(self.compressed_size, encoding=self.encoding, stage="compressed")
+        if self.chunks is not None:
+            entity = [(k, v) for k, v in self.start["headers"] if k.lower() in _ENTITY_HEADERS]
+            _cache.set(self.cache_key, (entity, b"".join(self.chunks)))
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import pickle
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.weather_query import WeatherQuery
+from app.services import exporter
+from app.services.table_versions import get_version
+
+RENDERERS = {
+    "json": (exporter.to_json, "json"),
+    "csv": (exporter.to_csv, "csv"),
+    "xml": (exporter.to_xml, "xml"),
+    "pdf": (exporter.to_pdf, "pdf"),
+    "markdown": (exporter.to_markdown, "md"),
+}
+
+# Rows per server-side cursor round trip and per pickled frame of the spool file
+SPOOL_BATCH_SIZE = 500
+
+# "<format>-<table version>"; the version orders artifacts of the same format
+_JOB_ID_RE = re.compile(r"^([a-z]+)-([0-9]+)$")
+
+_executor: ProcessPoolExecutor | None = None
+_jobs: dict[str, dict] = {}
+_tasks: dict[str, asyncio.Task] = {}
+
+
+def _artifact_dir() -> Path:
+    path = Path(settings.EXPORT_ARTIFACT_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def artifact_path(job_id: str) -> Path:
+    fmt = job_id.split("-", 1)[0]
+    return _artifact_dir() / f"{job_id}.{RENDERERS[fmt][1]}"
+
+
+def _read_spool(spool_path: str) -> Iterator[dict]:
+    with open(spool_path, "rb") as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _render_to_file(fmt: str, spool_path: str, total: int, path: str) -> None:
+    """
+    Render an export in a worker process from the spooled rows and move it into
+    place atomically. Row formats are written as they are read; PDF needs the
+    whole table for its layout.
+    """
+    records = _read_spool(spool_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        if fmt in exporter.STREAM_FORMATS:
+            exporter.write_records(fmt, records, total, f)
+        else:
+            content, _ = RENDERERS[fmt][0](list(records))
+            f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.EXPORT_WORKERS)
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def dataset_version(db: AsyncSession) -> int:
+    """The table's write counter (see table_versions): equal for unchanged data, higher for newer."""
+    version, _ = await get_version(db)
+    return version
+
+
+async def _spool_records(spool_path: str) -> int:
+    """
+    Write the table to a file as pickled batches of export rows, read through a
+    server-side cursor, so this process never holds more than one batch.
+    Returns the number of rows written.
+    """
+    stmt = (
+        select(*WeatherQuery.__table__.columns)
+        .order_by(WeatherQuery.created_at.desc())
+        .execution_options(yield_per=SPOOL_BATCH_SIZE)
+    )
+    count = 0
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(stmt)
+        with open(spool_path, "wb") as f:
+            async for partition in result.partitions():
+                batch = [exporter.record_to_dict(row) for row in partition]
+                await asyncio.to_thread(pickle.dump, batch, f, pickle.HIGHEST_PROTOCOL)
+                count += len(batch)
+    return count
+
+
+def _is_older(other_id: str, fmt: str, version: int) -> bool:
+    match = _JOB_ID_RE.match(other_id)
+    # Ids in an earlier naming scheme carry no version and count as older
+    return match is None or (match[1] == fmt and int(match[2]) < version)
+
+
+def _prune(job_id: str) -> None:
+    """
+    Forget finished jobs and artifacts of the same format from older data versions.
+    A job for older data that finishes late leaves newer artifacts alone.
+    """
+    fmt, version = _JOB_ID_RE.match(job_id).groups()
+    version = int(version)
+    for other_id, other in list(_jobs.items()):
+        if other["format"] == fmt and other_id not in _tasks and _is_older(other_id, fmt, version):
+            del _jobs[other_id]
+    for path in _artifact_dir().glob(f"{fmt}-*"):
+        if not path.name.endswith(".tmp") and _is_older(path.stem, fmt, version):
+            path.unlink(missing_ok=True)
+
+
+async def _run(job: dict) -> None:
+    job["status"] = "running"
+    fd, spool_path = tempfile.mkstemp(suffix=".spool")
+    os.close(fd)
+    try:
+        total = await _spool_records(spool_path)
+        path = artifact_path(job["id"])
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            _get_executor(), _render_to_file, job["format"], spool_path, total, str(path)
+        )
+        _prune(job["id"])
+        job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        os.unlink(spool_path)
+        job["finished_at"] = datetime.now(tz=timezone.utc)
+        _tasks.pop(job["id"], None)
+
+
+async def submit(fmt: str, db: AsyncSession) -> dict:
+    """
+    Start (or reuse) an export job. The job id is derived from the format and the
+    dataset version, so unchanged data maps to an existing artifact or running job.
+    """
+    job_id = f"{fmt}-{await dataset_version(db)}"
+    job = get_job(job_id)
+    if job is not None and (job["status"] in ("pending", "running") or artifact_path(job_id).exists()):
+        return job
+
+    job = {
+        "id": job_id,
+        "format": fmt,
+        "status": "pending",
+        "error": None,
+        "created_at": datetime.now(tz=timezone.utc),
+        "finished_at": None,
+    }
+    _jobs[job_id] = job
+    _tasks[job_id] = asyncio.create_task(_run(job))
+    return job
+
+
+def get_job(job_id: str) -> dict | None:
+    """Look up a job, falling back to artifacts on disk rendered by other workers."""
+    job = _jobs.get(job_id)
+    if job is not None:
+        return job
+    if not _JOB_ID_RE.match(job_id):
+        return None
+    fmt = job_id.split("-", 1)[0]
+    if fmt not in RENDERERS or not artifact_path(job_id).exists():
+        return None
+    job = {
+        "id": job_id,
+        "format": fmt,
+        "status": "done",
+        "error": None,
+        "created_at": None,
+        "finished_at": None,
+    }
+    _jobs[job_id] = job
+    return job
+
+
+async def wait(job_id: str) -> dict | None:
+    """Wait for a job to finish; None if an export of newer data pruned it meanwhile."""
+    task = _tasks.get(job_id)
+    if task is not None:
+        await asyncio.shield(task)
+    return _jobs.get(job_id)
@@ -1,9 +1,9 @@
+import csv
 import io
 import json
 import xml.etree.ElementTree as ET
-from typing import Any
+from typing import Any, AsyncIterator, BinaryIO, Iterable
 
-import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
@@ -11,6 +11,44 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 
 
+STREAM_CHUNK_SIZE = 64 * 1024
+
+CSV_COLUMNS = [
+    "id",
+    "location",
+    "resolved_location",
+    "latitude",
+    "longitude",
+    "start_date",
+    "end_date",
+    "date_range",
+    "temp_max_f",
+    "temp_min_f",
+    "precipitation_mm",
+    "created_at",
+    "updated_at",
+]
+
+# Columns pandas typed as float64 in the original CSV export, so whole numbers keep ".0"
+CSV_FLOAT_COLUMNS = ("latitude", "longitude", "temp_max_f", "temp_min_f", "precipitation_mm")
+
+
+def record_to_dict(r) -> dict[str, Any]:
+    """Serialize a WeatherQuery row (ORM object or column mapping) to a plain dict."""
+    return {
+        "id": r.id,
+        "location": r.location,
+        "resolved_location": r.resolved_location,
+        "latitude": float(r.latitude) if r.latitude is not None else None,
+        "longitude": float(r.longitude) if r.longitude is not None else None,
+        "start_date": r.start_date,
+        "end_date": r.end_date,
+        "weather_data": r.weather_data,
+        "created_at": r.created_at,
+        "updated_at": r.updated_at,
+    }
+
+
 def _flatten_record(record: dict[str, Any]) -> dict[str, Any]:
     """Flatten a weather query record to scalar fields for tabular exports."""
     weather = record.get("weather_data", {})
@@ -38,31 +76,146 @@ def _flatten_record(record: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def to_json(records: list[dict]) -> tuple[bytes, str]:
-    content = json.dumps(records, indent=2, default=str)
-    return content.encode("utf-8"), "application/json"
+class _JsonFormat:
+    media_type = "application/json"
+    needs_total = False
 
+    def header(self, total: int | None) -> str:
+        return "["
 
-def to_csv(records: list[dict]) -> tuple[bytes, str]:
-    flat = [_flatten_record(r) for r in records]
-    df = pd.DataFrame(flat)
-    buffer = io.StringIO()
-    df.to_csv(buffer, index=False)
-    return buffer.getvalue().encode("utf-8"), "text/csv"
+    def row(self, index: int, record: dict) -> str:
+        body = json.dumps(record, indent=2, default=str).replace("\n", "\n  ")
+        return ("," if index else "") + "\n  " + body
 
+    def footer(self, total: int | None, count: int) -> str:
+        return "\n]" if count else "]"
 
-def to_xml(records: list[dict]) -> tuple[bytes, str]:
-    root = ET.Element("weather_queries")
-    for record in records:
+
+class _CsvFormat:
+    media_type = "text/csv"
+    needs_total = False
+
+    def header(self, total: int | None) -> str:
+        return ",".join(CSV_COLUMNS) + "\n"
+
+    def row(self, index: int, record: dict) -> str:
         flat = _flatten_record(record)
-        item = ET.SubElement(root, "query")
-        for key, value in flat.items():
+        for column in CSV_FLOAT_COLUMNS:
+            if isinstance(flat[column], (int, float)):
+                flat[column] = float(flat[column])
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, lineterminator="\n").writerow(flat)
+        return buffer.getvalue()
+
+    def footer(self, total: int | None, count: int) -> str:
+        return ""
+
+
+class _XmlFormat:
+    media_type = "application/xml"
+    needs_total = False
+
+    def header(self, total: int | None) -> str:
+        return "<?xml version='1.0' encoding='utf-8'?>\n<weather_queries>"
+
+    def row(self, index: int, record: dict) -> str:
+        item = ET.Element("query")
+        for key, value in _flatten_record(record).items():
             child = ET.SubElement(item, key)
             child.text = str(value) if value is not None else ""
-    tree = ET.ElementTree(root)
-    buffer = io.BytesIO()
-    tree.write(buffer, encoding="utf-8", xml_declaration=True)
-    return buffer.getvalue(), "application/xml"
+        return ET.tostring(item, encoding="unicode")
+
+    def footer(self, total: int | None, count: int) -> str:
+        return "</weather_queries>"
+
+
+class _MarkdownFormat:
+    media_type = "text/markdown"
+    needs_total = True
+
+    def header(self, total: int | None) -> str:
+        if not total:
+            return ""
+        return (
+            "# Weather Queries Export\n\n"
+            f"Total records: {total}\n\n"
+            "| ID | Location | Start Date | End Date | Temp Max (°F) | Temp Min (°F) | Created At |\n"
+            "|---|---|---|---|---|---|---|"
+        )
+
+    def row(self, index: int, record: dict) -> str:
+        flat = _flatten_record(record)
+        return (
+            f"\n| {flat['id']} "
+            f"| {flat['resolved_location'] or flat['location']} "
+            f"| {flat['start_date']} "
+            f"| {flat['end_date']} "
+            f"| {flat['temp_max_f'] or 'N/A'} "
+            f"| {flat['temp_min_f'] or 'N/A'} "
+            f"| {str(flat['created_at'])[:19]} |"
+        )
+
+    def footer(self, total: int | None, count: int) -> str:
+        return "" if count else "# Weather Queries\n\n_No records found._\n"
+
+
+STREAM_FORMATS = {
+    "json": _JsonFormat(),
+    "csv": _CsvFormat(),
+    "xml": _XmlFormat(),
+    "markdown": _MarkdownFormat(),
+}
+
+
+def _render(fmt_name: str, records: list[dict]) -> tuple[bytes, str]:
+    fmt = STREAM_FORMATS[fmt_name]
+    parts = [fmt.header(len(records))]
+    parts.extend(fmt.row(i, record) for i, record in enumerate(records))
+    parts.append(fmt.footer(len(records), len(records)))
+    return "".join(parts).encode("utf-8"), fmt.media_type
+
+
+def write_records(fmt_name: str, records: Iterable[dict], total: int | None, out: BinaryIO) -> None:
+    """Encode records into a binary file one row at a time (same output as _render)."""
+    fmt = STREAM_FORMATS[fmt_name]
+    out.write(fmt.header(total).encode("utf-8"))
+    count = 0
+    for record in records:
+        out.write(fmt.row(count, record).encode("utf-8"))
+        count += 1
+    out.write(fmt.footer(total, count).encode("utf-8"))
+
+
+async def stream_records(
+    fmt_name: str, records: AsyncIterator[dict], total: int | None = None
+) -> AsyncIterator[bytes]:
+    """Encode records incrementally, yielding roughly STREAM_CHUNK_SIZE bytes at a time."""
+    fmt = STREAM_FORMATS[fmt_name]
+    buffer = [fmt.header(total)]
+    size = len(buffer[0])
+    count = 0
+    async for record in records:
+        chunk = fmt.row(count, record)
+        count += 1
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    buffer.append(fmt.footer(total, count))
+    yield "".join(buffer).encode("utf-8")
+
+
+def to_json(records: list[dict]) -> tuple[bytes, str]:
+    return _render("json", records)
+
+
+def to_csv(records: list[dict]) -> tuple[bytes, str]:
+    return _render("csv", records)
+
+
+def to_xml(records: list[dict]) -> tuple[bytes, str]:
+    return _render("xml", records)
 
 
 def to_pdf(records: list[dict]) -> tuple[bytes, str]:
@@ -108,24 +261,4 @@ def to_pdf(records: list[dict]) -> tuple[bytes, str]:
 
 
 def to_markdown(records: list[dict]) -> tuple[bytes, str]:
-    if not records:
-        return b"# Weather Queries\n\n_No records found._\n", "text/markdown"
-
-    lines = ["# Weather Queries Export\n"]
-    lines.append(f"Total records: {len(records)}\n")
-    lines.append("| ID | Location | Start Date | End Date | Temp Max (°F) | Temp Min (°F) | Created At |")
-    lines.append("|---|---|---|---|---|---|---|")
-
-    for record in records:
-        flat = _flatten_record(record)
-        lines.append(
-            f"| {flat['id']} "
-            f"| {flat['resolved_location'] or flat['location']} "
-            f"| {flat['start_date']} "
-            f"| {flat['end_date']} "
-            f"| {flat['temp_max_f'] or 'N/A'} "
-            f"| {flat['temp_min_f'] or 'N/A'} "
-            f"| {str(flat['created_at'])[:19]} |"
-        )
-
-    return "\n".join(lines).encode("utf-8"), "text/markdown"
+    return _render("markdown", records)
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, func, select, update
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services import resilience
+from app.models.weather_query import WeatherQuery
+from app.services.open_meteo import ARCHIVE_STABLE_DAYS, get_weather_for_range, slice_weather
+from app.services.weather_summary import summarize_weather
+
+logger = logging.getLogger(__name__)
+
+_task: asyncio.Task | None = None
+_stats = {"runs": 0, "scanned": 0, "patched": 0, "failed": 0, "stale": 0}
+
+
+def _unsettled_from(record: WeatherQuery) -> date:
+    """First day of a saved range that was still forecast (or unsettled archive) when written."""
+    return max(record.start_date, record.updated_at.date() - timedelta(days=ARCHIVE_STABLE_DAYS))
+
+
+def splice_tail(weather_data: dict, tail: dict, tail_start: date) -> dict:
+    """Replace every day from ``tail_start`` on with the days in ``tail``."""
+    head = slice_weather(weather_data, date.min, tail_start - timedelta(days=1))["daily"]
+    spliced = dict(tail)
+    tail_daily = tail.get("daily", {})
+    spliced["daily"] = {
+        key: head.get(key, []) + tail_daily.get(key, [])
+        for key in dict.fromkeys([*head, *tail_daily])
+    }
+    return spliced
+
+
+async def _patch(record: WeatherQuery, semaphore: asyncio.Semaphore) -> dict | None:
+    tail_start = _unsettled_from(record)
+    async with semaphore:
+        try:
+            with resilience.track_fallbacks() as stale:
+                tail = await get_weather_for_range(
+                    float(record.latitude), float(record.longitude), tail_start, record.end_date
+                )
+        except HTTPException:
+            logger.warning("Forecast refresh fetch failed for query %s", record.id, exc_info=True)
+            _stats["failed"] += 1
+            return None
+    if stale:
+        # Writing a fallback would bump updated_at and defer the real refresh by a TTL
+        _stats["stale"] += 1
+        return None
+    weather_data = splice_tail(record.weather_data, tail, tail_start)
+    return {
+        "b_id": record.id,
+        "b_updated_at": record.updated_at,
+        "weather_data": weather_data,
+        **summarize_weather(weather_data),
+    }
+
+
+async def refresh_once(now: datetime | None = None) -> int:
+    """
+    Re-fetch the unsettled tail of every saved query last written before the forecast
+    TTL elapsed, one page per transaction. Returns the number of rows patched.
+    """
+    now = now or datetime.now(tz=timezone.utc)
+    stale_before = now - timedelta(seconds=settings.WEATHER_FORECAST_CACHE_TTL_SECONDS)
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    table = WeatherQuery.__table__
+    # updated_at is bumped by the column's onupdate; rows edited since they were read no
+    # longer match b_updated_at and are left alone
+    stmt = update(table).where(
+        table.c.id == bindparam("b_id"), table.c.updated_at == bindparam("b_updated_at")
+    )
+    patched, last_id = 0, 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            page = (
+                await session.scalars(
+                    select(WeatherQuery)
+                    .where(
+                        WeatherQuery.id > last_id,
+                        WeatherQuery.latitude.is_not(None),
+                        WeatherQuery.updated_at < stale_before,
+                        # Some day in the range was unsettled when the row was last written
+                        WeatherQuery.end_date
+                        >= func.date(WeatherQuery.updated_at) - ARCHIVE_STABLE_DAYS,
+                    )
+                    .order_by(WeatherQuery.id)
+                    .limit(settings.FORECAST_REFRESH_BATCH_SIZE)
+                )
+            ).all()
+        if not page:
+            break
+        last_id = page[-1].id
+        _stats["scanned"] += len(page)
+        # Fetch outside any transaction, then write the whole page in one. Rows are
+        # updated one statement at a time: asyncpg reports no rowcount for executemany
+        rows = [row for row in await asyncio.gather(*(_patch(r, semaphore) for r in page)) if row]
+        if rows:
+            async with AsyncSessionLocal() as session:
+                for row in rows:
+                    patched += (await session.execute(stmt, row)).rowcount
+                await session.commit()
+    _stats["runs"] += 1
+    _stats["patched"] += patched
+    return patched
+
+
+async def _run() -> None:
+    while True:
+        await asyncio.sleep(settings.FORECAST_REFRESH_INTERVAL_SECONDS)
+        try:
+            patched = await refresh_once()
+            if patched:
+                logger.info("Refreshed forecasts for %d saved queries", patched)
+        except Exception:
+            logger.warning("Forecast refresh run failed", exc_info=True)
+
+
+def start() -> None:
+    global _task
+    if settings.FORECAST_REFRESH_INTERVAL_SECONDS > 0 and _task is None:
+        _task = asyncio.create_task(_run())
+
+
+async def stop() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+
+
+def stats() -> dict:
+    return dict(_stats)
@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.geocode_cache import GeocodeCacheEntry
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_DECIMAL_RE = re.compile(r"-?\d+\.\d+")
+_MAX_KEY_LENGTH = 255
+
+_memory = TTLCache(
+    max_entries=settings.GEOCODE_CACHE_MAX_ENTRIES,
+    ttl=settings.GEOCODE_CACHE_TTL_SECONDS,
+)
+db_hits = 0
+db_misses = 0
+
+
+def normalize_key(raw_input: str) -> str:
+    """Case-fold, collapse whitespace and round embedded coordinates to ~100 m."""
+    key = _WHITESPACE_RE.sub(" ", raw_input.casefold()).strip()
+    key = _DECIMAL_RE.sub(lambda m: f"{float(m.group()):.3f}", key)
+    key = re.sub(r"\s*,\s*", ",", key)
+    if len(key) > _MAX_KEY_LENGTH:
+        key = "sha256:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return key
+
+
+async def get(key: str) -> dict | None:
+    """Look up a resolved location, first in memory and then in the database."""
+    global db_hits, db_misses
+
+    geo = _memory.get(key)
+    if geo is not None:
+        return geo
+
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(seconds=settings.GEOCODE_CACHE_DB_TTL_SECONDS)
+    try:
+        async with AsyncSessionLocal() as session:
+            row = await session.scalar(
+                select(GeocodeCacheEntry).where(
+                    GeocodeCacheEntry.key == key,
+                    GeocodeCacheEntry.resolved_at >= cutoff,
+                )
+            )
+    except Exception:
+        logger.warning("Geocode cache lookup failed for %r", key, exc_info=True)
+        return None
+
+    if row is None:
+        db_misses += 1
+        return None
+
+    db_hits += 1
+    geo = {
+        "resolved_name": row.resolved_name,
+        "latitude": float(row.latitude),
+        "longitude": float(row.longitude),
+    }
+    _memory.set(key, geo)
+    return geo
+
+
+async def put(key: str, geo: dict) -> None:
+    """Store a resolved location in both tiers; database failures are non-fatal."""
+    _memory.set(key, geo)
+    values = {
+        "key": key,
+        "resolved_name": geo["resolved_name"][:255],
+        "latitude": geo["latitude"],
+        "longitude": geo["longitude"],
+        "resolved_at": datetime.now(tz=timezone.utc),
+    }
+    stmt = insert(GeocodeCacheEntry).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GeocodeCacheEntry.key],
+        set_={k: stmt.excluded[k] for k in ("resolved_name", "latitude", "longitude", "resolved_at")},
+    )
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+    except Exception:
+        logger.warning("Geocode cache write failed for %r", key, exc_info=True)
+
+
+def stats() -> dict:
+    return {
+        "memory": _memory.stats(),
+        "database": {"hits": db_hits, "misses": db_misses},
+    }
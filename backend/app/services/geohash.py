@@ -0,0 +1,76 @@
+import math
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+# Precision stored on weather_queries (~4.8 m x 4.8 m cells)
+PRECISION = 9
+
+
+def encode(lat: float, lon: float, precision: int = PRECISION) -> str:
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            value = value << 1 | (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            value = value << 1 | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def decode_bounds(geohash: str) -> tuple[float, float, float, float]:
+    """Return (lat_lo, lat_hi, lon_lo, lon_hi) of a geohash cell."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = value >> shift & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+
+def cell_size_km(precision: int, lat: float = 0.0) -> tuple[float, float]:
+    """Approximate (height, width) of a cell in km at the given latitude."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    height = 180.0 / 2**lat_bits * 111.32
+    width = 360.0 / 2**lon_bits * 111.32 * math.cos(math.radians(lat))
+    return height, width
+
+
+def covering_cells(lat: float, lon: float, radius_km: float) -> list[str]:
+    """
+    Geohash prefixes whose cells together contain every point within ``radius_km``:
+    the finest precision whose cells are at least that large, plus its 8 neighbours.
+    """
+    precision = 1
+    while precision < PRECISION and min(cell_size_km(precision + 1, lat)) >= radius_km:
+        precision += 1
+    lat_lo, lat_hi, lon_lo, lon_hi = decode_bounds(encode(lat, lon, precision))
+    dlat, dlon = lat_hi - lat_lo, lon_hi - lon_lo
+    centre_lat, centre_lon = (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+    cells = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            cell_lat = centre_lat + i * dlat
+            if not -90 <= cell_lat <= 90:
+                continue
+            cell_lon = (centre_lon + j * dlon + 180) % 360 - 180
+            cells.add(encode(cell_lat, cell_lon, precision))
+    return sorted(cells)
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.weather_query_hourly import WeatherQueryHourly
+from app.services.columnar import ENCODING, decode_series, downsample, encode_series
+
+
+def build_rows(query_id: int, payload: dict) -> list[dict]:
+    """Encode each hourly variable of an Open-Meteo payload as one compressed row."""
+    hourly = payload.get("hourly", {})
+    times = hourly.get("time", [])
+    if not times:
+        return []
+    units = payload.get("hourly_units", {})
+    step = int(times[1] - times[0]) if len(times) > 1 else 3600
+    return [
+        {
+            "query_id": query_id,
+            "variable": name,
+            "unit": units.get(name),
+            "encoding": ENCODING,
+            "start_ts": int(times[0]),
+            "step_seconds": step,
+            "count": len(series),
+            "data": encode_series(series),
+        }
+        for name, series in hourly.items()
+        if name != "time"
+    ]
+
+
+async def replace_series(db: AsyncSession, query_id: int, payload: dict) -> None:
+    await db.execute(delete(WeatherQueryHourly).where(WeatherQueryHourly.query_id == query_id))
+    rows = build_rows(query_id, payload)
+    if rows:
+        await db.execute(insert(WeatherQueryHourly), rows)
+
+
+async def has_series(db: AsyncSession, query_id: int) -> bool:
+    stmt = select(WeatherQueryHourly.query_id).where(WeatherQueryHourly.query_id == query_id).limit(1)
+    return (await db.scalar(stmt)) is not None
+
+
+def _epoch(moment: datetime) -> int:
+    """Unix seconds; naive datetimes are UTC, like the stored series, not server-local."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+async def load_series(
+    db: AsyncSession,
+    query_id: int,
+    variables: list[str] | None,
+    start: datetime | None,
+    end: datetime | None,
+    max_points: int,
+) -> dict:
+    """
+    Decode only the requested variables, cut them to [start, end] and average them
+    down to at most ``max_points`` samples.
+    """
+    stmt = select(WeatherQueryHourly).where(WeatherQueryHourly.query_id == query_id)
+    if variables:
+        stmt = stmt.where(WeatherQueryHourly.variable.in_(variables))
+    rows = (await db.scalars(stmt)).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="No hourly data stored for this query")
+
+    step = rows[0].step_seconds
+    start_ts = rows[0].start_ts
+    count = rows[0].count
+    lo = 0 if start is None else max(0, -(-(_epoch(start) - start_ts) // step))
+    hi = count if end is None else min(count, (_epoch(end) - start_ts) // step + 1)
+    hi = max(lo, hi)
+
+    series, units, factor = {}, {}, 1
+    for row in rows:
+        values = decode_series(row.data, row.count)[lo:hi]
+        values, factor = downsample(values, max_points)
+        series[row.variable] = [None if np.isnan(v) else round(float(v), 2) for v in values]
+        units[row.variable] = row.unit
+
+    out_step = step * factor
+    first = start_ts + lo * step
+    length = len(next(iter(series.values())))
+    return {
+        "query_id": query_id,
+        "step_seconds": out_step,
+        "time": [first + i * out_step for i in range(length)],
+        "units": units,
+        "series": series,
+    }
@@ -0,0 +1,54 @@
+import httpx
+
+from app.config import settings
+from app.services import metrics
+
+# Read timeout per upstream; connect/pool timeouts are shared
+_TIMEOUT_SETTINGS = {
+    "open_meteo": "OPEN_METEO_TIMEOUT",
+    "openweather": "OPENWEATHER_TIMEOUT",
+    "unsplash": "UNSPLASH_TIMEOUT",
+    "youtube": "YOUTUBE_TIMEOUT",
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    read_timeout = getattr(settings, _TIMEOUT_SETTINGS[name])
+    return httpx.AsyncClient(
+        http2=settings.HTTP2_ENABLED,
+        timeout=httpx.Timeout(
+            read_timeout,
+            connect=min(settings.HTTP_CONNECT_TIMEOUT, read_timeout),
+            pool=settings.HTTP_POOL_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        event_hooks=metrics.httpx_hooks(name),
+    )
+
+
+async def startup() -> None:
+    """Create one pooled client per upstream; called from the app lifespan."""
+    for name in _TIMEOUT_SETTINGS:
+        if name not in _clients:
+            _clients[name] = _build_client(name)
+
+
+async def shutdown() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """Return the shared client for an upstream, creating it if the lifespan has not run."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _clients[name] = _build_client(name)
+    return client
@@ -0,0 +1,191 @@
+import csv
+import math
+import re
+import unicodedata
+from pathlib import Path
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.csv"
+
+# Coordinates closer than this to a gazetteer entry are labelled with its name
+NEAREST_CITY_RADIUS_KM = 50.0
+
+_NUMBER = r"\d+(?:\.\d+)?"
+_COMPONENT_RE = re.compile(
+    rf"""
+    ^\s*
+    (?P<pre>[NSEW])?\s*
+    (?P<sign>[-+])?\s*
+    (?P<deg>{_NUMBER})\s*(?:°|º|deg|d)?\s*
+    (?:(?P<min>{_NUMBER})\s*(?:'|′|’|min|m)\s*)?
+    (?:(?P<sec>{_NUMBER})\s*(?:"|″|''|sec|s)\s*)?
+    (?P<post>[NSEW])?
+    \s*$
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_LABEL_RE = re.compile(r"\b(?:lat(?:itude)?|lon(?:gitude)?|lng)\b\s*[:=]?", re.IGNORECASE)
+_HEMISPHERE_SPLIT_RE = re.compile(r"(?<=[NSns])[\s,;/]*(?=[EWew\d+-])|(?<=[EWew])[\s,;/]*(?=[NSns\d+-])")
+_US_ZIP_RE = re.compile(r"^(\d{5})(?:-\d{4})?$")
+_UK_POSTCODE_RE = re.compile(r"^([A-Z]{1,2}\d[A-Z\d]?)\s*\d[A-Z]{2}$")
+_CA_POSTCODE_RE = re.compile(r"^([A-Z]\d[A-Z])\s*\d[A-Z]\d$")
+
+
+def _fold(text: str) -> str:
+    """Case-fold, strip accents and punctuation, and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[.,;:'\"()]", " ", text)
+    return " ".join(text.split())
+
+
+def _normalize_postal(text: str) -> str | None:
+    code = " ".join(text.upper().split())
+    if m := _US_ZIP_RE.match(code):
+        return m.group(1)
+    if m := _UK_POSTCODE_RE.match(code) or _CA_POSTCODE_RE.match(code):
+        return m.group(1)
+    if re.fullmatch(r"[A-Z0-9-]{2,10}", code):
+        return code
+    return None
+
+
+class Gazetteer:
+    """Offline city/postal-code table with hash indexes on folded names and codes."""
+
+    def __init__(self, path: Path):
+        self.entries: list[dict] = []
+        self.by_name: dict[str, dict] = {}
+        self.by_postal: dict[str, dict] = {}
+        ambiguous_names: set[str] = set()
+        ambiguous_codes: set[str] = set()
+
+        with path.open(encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                entry = {
+                    "resolved_name": row["display_name"],
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                }
+                self.entries.append(entry)
+                names = {_fold(row["display_name"])}
+                names.update(_fold(a) for a in row["aliases"].split("|") if a)
+                for name in names:
+                    if name in self.by_name and self.by_name[name] is not entry:
+                        ambiguous_names.add(name)
+                    self.by_name[name] = entry
+                for code in filter(None, row["postal_codes"].split("|")):
+                    if code in self.by_postal and self.by_postal[code] is not entry:
+                        ambiguous_codes.add(code)
+                    self.by_postal[code] = entry
+
+        # Keys shared by more than one place are left for the LLM to disambiguate
+        for name in ambiguous_names:
+            del self.by_name[name]
+        for code in ambiguous_codes:
+            del self.by_postal[code]
+
+    def lookup(self, text: str) -> dict | None:
+        code = _normalize_postal(text)
+        if code is not None and code in self.by_postal:
+            return self.by_postal[code]
+        return self.by_name.get(_fold(text))
+
+    def nearest(self, lat: float, lon: float, radius_km: float) -> dict | None:
+        best, best_km = None, radius_km
+        for entry in self.entries:
+            km = haversine_km(lat, lon, entry["latitude"], entry["longitude"])
+            if km <= best_km:
+                best, best_km = entry, km
+        return best
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def _parse_component(text: str) -> tuple[float, str | None] | None:
+    """Parse one decimal or DMS coordinate; returns (value, hemisphere letter)."""
+    m = _COMPONENT_RE.match(text)
+    if not m:
+        return None
+    pre, post = m.group("pre"), m.group("post")
+    if pre and post:
+        return None
+    hemisphere = (pre or post or "").upper() or None
+    value = float(m.group("deg"))
+    if m.group("min"):
+        value += float(m.group("min")) / 60
+    if m.group("sec"):
+        value += float(m.group("sec")) / 3600
+    if m.group("sign") == "-" or hemisphere in ("S", "W"):
+        if m.group("sign") == "-" and hemisphere in ("S", "W"):
+            return None
+        value = -value
+    return value, hemisphere
+
+
+def _split_pair(text: str) -> list[str]:
+    text = _LABEL_RE.sub(" ", text).strip()
+    for sep in (",", ";", "/"):
+        parts = [p for p in text.split(sep) if p.strip()]
+        if len(parts) == 2:
+            return parts
+    parts = [p for p in _HEMISPHERE_SPLIT_RE.split(text) if p and p.strip()]
+    if len(parts) == 2:
+        return parts
+    return text.split()
+
+
+def parse_coordinates(text: str) -> tuple[float, float] | None:
+    """Parse a lat/lon pair in decimal or DMS notation, with optional N/S/E/W."""
+    parts = _split_pair(text)
+    if len(parts) != 2:
+        return None
+    first, second = _parse_component(parts[0]), _parse_component(parts[1])
+    if first is None or second is None:
+        return None
+
+    (a, ha), (b, hb) = first, second
+    if ha in ("E", "W") or hb in ("N", "S"):
+        (a, ha), (b, hb) = (b, hb), (a, ha)
+    if ha in ("E", "W") or hb in ("N", "S"):
+        return None
+    # Bare integer pairs such as "10001 10002" are more likely codes than coordinates
+    if ha is None and hb is None and not re.search(r"[.°º'′\"″-]", text):
+        return None
+    if not (-90 <= a <= 90 and -180 <= b <= 180):
+        return None
+    return a, b
+
+
+_gazetteer: Gazetteer | None = None
+
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(GAZETTEER_PATH)
+    return _gazetteer
+
+
+def resolve_locally(raw_input: str) -> dict | None:
+    """Resolve coordinates, postal codes and known cities without calling the LLM."""
+    text = raw_input.strip()
+    if not text:
+        return None
+
+    coords = parse_coordinates(text)
+    if coords is not None:
+        lat, lon = coords
+        near = get_gazetteer().nearest(lat, lon, NEAREST_CITY_RADIUS_KM)
+        name = near["resolved_name"] if near else f"{lat:.4f}, {lon:.4f}"
+        return {"resolved_name": name, "latitude": round(lat, 6), "longitude": round(lon, 6)}
+
+    entry = get_gazetteer().lookup(text)
+    if entry is not None:
+        return dict(entry)
+    return None
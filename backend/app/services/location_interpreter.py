@@ -1,14 +1,48 @@
 import json
 import re
+import time
 
 from fastapi import HTTPException
 from google import genai
+from google.genai import types
 from app.config import settings
+from app.services import geocode_cache, metrics
+from app.services.local_geocoder import resolve_locally
+from app.services.singleflight import coalesce
 
-_client = genai.Client(api_key=settings.GEMINI_API_KEY)
+_client = genai.Client(
+    api_key=settings.GEMINI_API_KEY,
+    http_options=types.HttpOptions(base_url=settings.GEMINI_BASE_URL) if settings.GEMINI_BASE_URL else None,
+)
 
 
+@coalesce(key=geocode_cache.normalize_key)
 async def interpret_location(raw_input: str) -> dict:
+    """
+    Resolve any location input to a name and coordinates.
+    Coordinates, postal codes and known cities are answered locally; everything
+    else goes through the geocode cache and, on a miss, Gemini.
+    """
+    started = time.perf_counter()
+    geo = resolve_locally(raw_input)
+    if geo is not None:
+        metrics.observe_location("local", time.perf_counter() - started)
+        return geo
+
+    key = geocode_cache.normalize_key(raw_input)
+    geo = await geocode_cache.get(key)
+    if geo is not None:
+        metrics.observe_location("cache", time.perf_counter() - started)
+        return geo
+    try:
+        geo = await _resolve_with_gemini(raw_input)
+    finally:
+        metrics.observe_location("gemini", time.perf_counter() - started)
+    await geocode_cache.put(key, geo)
+    return geo
+
+
+async def _resolve_with_gemini(raw_input: str) -> dict:
     """Use Gemini to resolve any location input to a name and coordinates."""
     try:
         response = await _client.aio.models.generate_content(
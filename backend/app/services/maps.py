@@ -1,12 +1,10 @@
 from urllib.parse import quote
 
 from app.config import settings
-from app.services.location_interpreter import interpret_location
 
 
-async def get_map_data(location: str) -> dict:
-    """Geocode the location and build a Google Maps Embed URL."""
-    geo = await interpret_location(location)
+def get_map_data(geo: dict) -> dict:
+    """Build a Google Maps Embed URL for an already-resolved location."""
     encoded_name = quote(geo["resolved_name"])
     embed_url = (
         f"https://www.google.com/maps/embed/v1/place"
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.media_cache import MediaCacheEntry
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# (kind, key) -> (payload, fetched_at); freshness is judged from fetched_at, not the LRU
+_memory = TTLCache(max_entries=settings.MEDIA_CACHE_MAX_ENTRIES, ttl=None)
+_refreshing: dict[tuple[str, str], asyncio.Task] = {}
+
+
+def normalize_key(name: str) -> str:
+    key = " ".join(name.casefold().split())
+    if len(key) > 255:
+        key = "sha256:" + hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return key
+
+
+async def _load(kind: str, key: str) -> tuple[list, datetime] | None:
+    entry = _memory.get((kind, key))
+    if entry is not None:
+        return entry
+    try:
+        async with AsyncSessionLocal() as session:
+            row = await session.get(MediaCacheEntry, (kind, key))
+    except Exception:
+        logger.warning("Media cache lookup failed for %s %r", kind, key, exc_info=True)
+        return None
+    if row is None:
+        return None
+    entry = (row.payload, row.fetched_at)
+    _memory.set((kind, key), entry)
+    return entry
+
+
+async def _store(kind: str, key: str, payload: list) -> None:
+    fetched_at = datetime.now(tz=timezone.utc)
+    _memory.set((kind, key), (payload, fetched_at))
+    stmt = insert(MediaCacheEntry).values(kind=kind, key=key, payload=payload, fetched_at=fetched_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MediaCacheEntry.kind, MediaCacheEntry.key],
+        set_={"payload": stmt.excluded.payload, "fetched_at": stmt.excluded.fetched_at},
+    )
+    try:
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+    except Exception:
+        logger.warning("Media cache write failed for %s %r", kind, key, exc_info=True)
+
+
+async def _refresh(kind: str, key: str, fetch: Callable[[], Awaitable[list]]) -> None:
+    try:
+        await _store(kind, key, await fetch())
+    except Exception:
+        # Keep serving the stale entry; the next request past the TTL retries
+        logger.warning("Background media refresh failed for %s %r", kind, key, exc_info=True)
+    finally:
+        _refreshing.pop((kind, key), None)
+
+
+async def cached(kind: str, name: str, fetch: Callable[[], Awaitable[list]]) -> list:
+    """
+    Return media results for ``name`` with stale-while-revalidate semantics: fresh
+    entries are served as-is, stale ones are served while a background task refreshes
+    them, and entries past the stale window (or missing) are fetched inline.
+    """
+    key = normalize_key(name)
+    entry = await _load(kind, key)
+    if entry is not None:
+        payload, fetched_at = entry
+        age = (datetime.now(tz=timezone.utc) - fetched_at).total_seconds()
+        if age < settings.MEDIA_CACHE_TTL_SECONDS:
+            return payload
+        if age < settings.MEDIA_CACHE_STALE_SECONDS:
+            if (kind, key) not in _refreshing:
+                _refreshing[(kind, key)] = asyncio.create_task(_refresh(kind, key, fetch))
+            return payload
+
+    payload = await fetch()
+    await _store(kind, key, payload)
+    return payload
+
+
+def stats() -> dict:
+    return {"memory": _memory.stats(), "refreshing": len(_refreshing)}
@@ -0,0 +1,305 @@
+import bisect
+import math
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# category -> [seconds, count] for the request being served, when Server-Timing is on
+_request_timings: ContextVar[dict[str, list[float]] | None] = ContextVar("request_timings", default=None)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (per-bucket counts incl. +Inf, sum)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def collect(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total) in sorted(self._series.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                yield f"{self.name}_bucket{_format_labels({**labels, 'le': le})} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total[0])}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+_metrics: list[Counter | Histogram] = []
+# metric family -> (type, help)
+Families = dict[str, tuple[str, str]]
+# name -> (families it yields, callback returning samples); evaluated at scrape time
+_collectors: dict[str, tuple[Families, Callable[[], Iterable[Sample]]]] = {}
+
+
+def register(metric):
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(name: str, families: Families, fn: Callable[[], Iterable[Sample]]) -> None:
+    """
+    Expose values owned elsewhere (cache stats, pool sizes) computed when scraped.
+    ``families`` declares the type and help of every metric ``fn`` yields: ``counter``
+    for monotonic totals (named ``*_total``), ``gauge`` for sizes and levels.
+    """
+    _collectors[name] = (families, fn)
+
+
+HTTP_REQUESTS = register(
+    Counter("http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+)
+HTTP_DURATION = register(
+    Histogram("http_request_duration_seconds", "Time to serve an HTTP request.", ("method", "route"))
+)
+UNHANDLED_ERRORS = register(
+    Counter("http_unhandled_exceptions_total", "Exceptions that reached the global handler.", ("route", "exception"))
+)
+UPSTREAM_REQUESTS = register(
+    Counter("upstream_requests_total", "Outbound HTTP calls by upstream and status.", ("upstream", "status"))
+)
+UPSTREAM_DURATION = register(
+    Histogram("upstream_request_duration_seconds", "Outbound HTTP call time to response headers.", ("upstream",))
+)
+DB_DURATION = register(
+    Histogram("db_statement_duration_seconds", "Database statement execution time.", ("operation",))
+)
+DB_ERRORS = register(Counter("db_statement_errors_total", "Database statements that raised.", ("operation",)))
+LOCATION_DURATION = register(
+    Histogram("location_resolve_duration_seconds", "interpret_location time by answering tier.", ("source",))
+)
+
+
+def start_request_timing() -> object:
+    return _request_timings.set({})
+
+
+def finish_request_timing(token) -> dict[str, list[float]]:
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def add_timing(category: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(category, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+def server_timing_header(timings: dict[str, list[float]], total: float) -> str:
+    parts = [f'{name};dur={seconds * 1000:.1f};desc="{count} calls"' for name, (seconds, count) in timings.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def observe_location(source: str, seconds: float) -> None:
+    LOCATION_DURATION.observe(seconds, source=source)
+    add_timing("geocode", seconds)
+
+
+def httpx_hooks(upstream: str) -> dict[str, list]:
+    """Event hooks that time each call on a shared client."""
+
+    async def on_request(request):
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def on_response(response):
+        started = response.request.extensions.get("metrics_start")
+        UPSTREAM_REQUESTS.inc(upstream=upstream, status=response.status_code)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_DURATION.observe(elapsed, upstream=upstream)
+            add_timing(upstream, elapsed)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement and expose connection pool usage."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_start"].pop()
+        DB_DURATION.observe(elapsed, operation=_operation(statement))
+        add_timing("db", elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("metrics_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        DB_ERRORS.inc(operation=_operation(context.statement or ""))
+
+    pool = sync_engine.pool
+
+    def pool_samples():
+        size = pool.size()
+        checked_out = pool.checkedout()
+        capacity = size + max(getattr(pool, "_max_overflow", 0), 0)
+        yield "db_pool_size", {}, size
+        yield "db_pool_checked_out", {}, checked_out
+        yield "db_pool_overflow", {}, max(pool.overflow(), 0)
+        yield "db_pool_saturation", {}, checked_out / capacity if capacity else 0.0
+
+    register_collector(
+        "db_pool",
+        {
+            "db_pool_size": ("gauge", "Connections the pool keeps open."),
+            "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool."),
+            "db_pool_overflow": ("gauge", "Connections open beyond the pool size."),
+            "db_pool_saturation": ("gauge", "Checked-out connections / (pool size + max overflow)."),
+        },
+        pool_samples,
+    )
+
+
+_CACHE_SAMPLES = {
+    "entries": "cache_entries",
+    "hits": "cache_hits_total",
+    "misses": "cache_misses_total",
+    "hit_ratio": "cache_hit_ratio",
+    "bytes": "cache_bytes",
+}
+
+
+def _cache_samples(name: str, stats: dict) -> Iterable[Sample]:
+    labels = {"cache": name}
+    for key, metric in _CACHE_SAMPLES.items():
+        if key in stats:
+            yield metric, labels, stats[key]
+
+
+def _service_samples() -> Iterable[Sample]:
+    from app.services import (
+        compression,
+        forecast_refresher,
+        geocode_cache,
+        media_cache,
+        open_meteo,
+        query_stats,
+        singleflight,
+    )
+
+    geocode = geocode_cache.stats()
+    yield from _cache_samples("geocode_memory", geocode["memory"])
+    yield from _cache_samples("geocode_db", geocode["database"])
+    yield from _cache_samples("media_memory", media_cache.stats()["memory"])
+    yield from _cache_samples("query_stats", query_stats.stats())
+    yield from _cache_samples("compressed_responses", compression.stats())
+    weather = open_meteo.stats()
+    yield from _cache_samples("weather_day", weather["day_cache"])
+    yield "open_meteo_batched_requests_total", {}, weather["batcher"]["requests"]
+    yield "open_meteo_batched_points_total", {}, weather["batcher"]["points"]
+    for function, counts in singleflight.stats().items():
+        yield "singleflight_calls_total", {"function": function}, counts["calls"]
+        yield "singleflight_deduplicated_total", {"function": function}, counts["deduplicated"]
+    for key, value in forecast_refresher.stats().items():
+        yield f"forecast_refresh_{key}_total", {}, value
+
+
+register_collector(
+    "services",
+    {
+        "cache_entries": ("gauge", "Entries held by an in-process cache."),
+        "cache_hits_total": ("counter", "Cache lookups that found an entry."),
+        "cache_misses_total": ("counter", "Cache lookups that found no usable entry."),
+        "cache_hit_ratio": ("gauge", "Hits / lookups since start."),
+        "cache_bytes": ("gauge", "Bytes held by an in-process cache with a size budget."),
+        "open_meteo_batched_requests_total": ("counter", "Multi-location Open-Meteo calls sent by the micro-batcher."),
+        "open_meteo_batched_points_total": ("counter", "Point requests carried by micro-batched calls."),
+        "singleflight_calls_total": ("counter", "Calls to a coalesced function."),
+        "singleflight_deduplicated_total": ("counter", "Calls that joined an identical call already in flight."),
+        "forecast_refresh_runs_total": ("counter", "Forecast refresh passes completed."),
+        "forecast_refresh_scanned_total": ("counter", "Saved queries examined by the forecast refresher."),
+        "forecast_refresh_patched_total": ("counter", "Saved queries whose forecast tail was rewritten."),
+        "forecast_refresh_failed_total": ("counter", "Saved queries whose forecast re-fetch failed."),
+        "forecast_refresh_stale_total": ("counter", "Saved queries skipped because the re-fetch was a stale fallback."),
+    },
+    _service_samples,
+)
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.collect())
+    for families, fn in _collectors.values():
+        samples = list(fn())
+        for name in dict.fromkeys(name for name, _, _ in samples):
+            kind, documentation = families[name]
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(
+                f"{n}{_format_labels(labels)} {_format_value(value)}" for n, labels, value in samples if n == name
+            )
+    return "\n".join(lines) + "\n"
@@ -1,60 +1,325 @@
-from datetime import date, datetime, timezone
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone
 
 import httpx
 from fastapi import HTTPException
 
-ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
-FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+from app.config import settings
+from app.services.cache import TTLCache
+from app.services import resilience, weather_store
+
+ARCHIVE_URL = settings.OPEN_METEO_ARCHIVE_URL
+FORECAST_URL = settings.OPEN_METEO_FORECAST_URL
 
 DAILY_VARS = "temperature_2m_max,temperature_2m_min,weathercode,precipitation_sum"
+HOURLY_VARS = "temperature_2m,wind_speed_10m,relative_humidity_2m"
 
+# Archive values are revised for a few days after the fact; older days never change
+ARCHIVE_STABLE_DAYS = 5
+
+# (lat, lon, day, variables) -> {"meta": response without "daily", "values": {var: value}}
+_day_cache = TTLCache(
+    max_entries=settings.WEATHER_DAY_CACHE_MAX_ENTRIES,
+    ttl=settings.WEATHER_FORECAST_CACHE_TTL_SECONDS,
+)
+
+
+def snap_to_grid(lat: float, lon: float) -> tuple[float, float]:
+    """
+    Snap to the centre of the provider grid cell (OPEN_METEO_GRID_DEGREES), so nearby
+    inputs that the model answers identically share requests and cached days.
+    """
+    step = settings.OPEN_METEO_GRID_DEGREES
+    return round(round(float(lat) / step) * step, 6), round(round(float(lon) / step) * step, 6)
+
+
+def _remaining_ttl(day: date, fetched_at: datetime, now: datetime) -> float | None:
+    """
+    Seconds a fetched day stays valid: None for archive days that had settled when
+    fetched, otherwise what is left of the forecast TTL (<= 0 means stale).
+    """
+    if day < fetched_at.date() - timedelta(days=ARCHIVE_STABLE_DAYS):
+        return None
+    age = (now - fetched_at).total_seconds()
+    return settings.WEATHER_FORECAST_CACHE_TTL_SECONDS - age
+
+
+async def _load_stored_days(
+    lat: float, lon: float, days: list[date], entries: dict[date, dict], now: datetime
+) -> None:
+    """Fill gaps in ``entries`` from the weather_observations table, promoting hits to memory."""
+    missing = [day for day in days if day not in entries]
+    if not missing:
+        return
+    wanted = DAILY_VARS.split(",")
+    stored = await weather_store.load_days(lat, lon, missing[0], missing[-1])
+    for day in missing:
+        row = stored.get(day)
+        if row is None or not all(var in row["values"] for var in wanted):
+            continue
+        ttl = _remaining_ttl(day, row["fetched_at"], now)
+        if ttl is not None and ttl <= 0:
+            continue
+        entry = {"meta": row["meta"], "values": row["values"]}
+        _day_cache.set((lat, lon, day, DAILY_VARS), entry, ttl=ttl)
+        entries[day] = entry
+
+
+def _missing_runs(days: list[date], cached: dict[date, dict]) -> list[tuple[date, date]]:
+    """Coalesce uncached days into contiguous (start, end) ranges."""
+    runs = []
+    for day in days:
+        if day in cached:
+            continue
+        if runs and runs[-1][1] == day - timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
 
-def _merge_daily(a: dict, b: dict) -> dict:
-    """Merge two Open-Meteo daily response dicts."""
-    merged = {}
-    for key in a:
-        merged[key] = a[key] + b.get(key, [])
-    return merged
 
+def _split_at_today(start: date, end: date, today: date) -> list[tuple[str, date, date]]:
+    """Split a range into archive (up to today) and forecast (after today) requests."""
+    if end <= today:
+        return [(ARCHIVE_URL, start, end)]
+    if start > today:
+        return [(FORECAST_URL, start, end)]
+    return [(ARCHIVE_URL, start, today), (FORECAST_URL, today + timedelta(days=1), end)]
 
-async def _fetch(url: str, lat: float, lon: float, start: date, end: date) -> dict:
+
+async def _fetch_many(
+    url: str,
+    coords: list[tuple[float, float]],
+    start: date,
+    end: date,
+    variables: str = DAILY_VARS,
+    extra_params: dict | None = None,
+) -> tuple[list[dict], bool]:
+    """
+    Fetch one date range for several points in a single request (one result per point).
+    The flag is true when resilience answered with a stored fallback instead of live data.
+    """
     params = {
-        "latitude": lat,
-        "longitude": lon,
-        "daily": DAILY_VARS,
+        "latitude": ",".join(str(lat) for lat, _ in coords),
+        "longitude": ",".join(str(lon) for _, lon in coords),
         "start_date": start.isoformat(),
         "end_date": end.isoformat(),
         "timezone": "auto",
         "temperature_unit": "fahrenheit",
+        **(extra_params or {}),
     }
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    if variables:
+        params["daily"] = variables
+    try:
+        resp = await resilience.get("open_meteo", url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Open-Meteo error: {e.response.text}",
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=502, detail=f"Open-Meteo unreachable: {e}")
+    # A single location comes back as an object, several as a list in request order
+    results = data if isinstance(data, list) else [data]
+    if len(results) != len(coords):
+        raise HTTPException(status_code=502, detail="Open-Meteo returned an unexpected number of locations")
+    return results, resilience.is_fallback(resp)
+
+
+async def _fetch(
+    url: str, lat: float, lon: float, start: date, end: date, variables: str = DAILY_VARS
+) -> tuple[dict, bool]:
+    results, stale = await _fetch_many(url, [(lat, lon)], start, end, variables)
+    return results[0], stale
+
+
+class _MicroBatcher:
+    """
+    Collect point requests that arrive within a short window and share the same
+    (url, date range, variables), then send them as one multi-location call.
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple, list[tuple[float, float, asyncio.Future]]] = {}
+        self._timers: dict[tuple, asyncio.TimerHandle] = {}
+        # In-flight sends; the loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+        self.requests = 0
+        self.points = 0
+
+    async def fetch(
+        self, url: str, lat: float, lon: float, start: date, end: date, variables: str
+    ) -> tuple[dict, bool]:
+        window = settings.OPEN_METEO_BATCH_WINDOW_MS / 1000
+        if window <= 0:
+            return await _fetch(url, lat, lon, start, end, variables)
+
+        loop = asyncio.get_running_loop()
+        key = (url, start, end, variables)
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((lat, lon, future))
+        if len(batch) >= settings.OPEN_METEO_BATCH_MAX_LOCATIONS:
+            self._flush_now(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(window, self._flush_now, key)
+        return await future
+
+    def _flush_now(self, key: tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._send(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key: tuple, batch: list[tuple[float, float, asyncio.Future]]) -> None:
+        url, start, end, variables = key
+        coords = list(dict.fromkeys((lat, lon) for lat, lon, _ in batch))
+        self.requests += 1
+        self.points += len(batch)
         try:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            return resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(
-                status_code=502,
-                detail=f"Open-Meteo error: {e.response.text}",
-            )
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=502, detail=f"Open-Meteo unreachable: {e}")
+            results, stale = await _fetch_many(url, coords, start, end, variables)
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        by_coords = dict(zip(coords, results))
+        for lat, lon, future in batch:
+            if not future.done():
+                future.set_result((by_coords[(lat, lon)], stale))
+
+    async def close(self) -> None:
+        """Send batches still waiting for their window and wait for every send to finish."""
+        for key in list(self._pending):
+            self._flush_now(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "points": self.points}
+
+
+_batcher = _MicroBatcher()
+
+
+async def shutdown() -> None:
+    await _batcher.close()
+
+
+def stats() -> dict:
+    return {"day_cache": _day_cache.stats(), "batcher": _batcher.stats()}
+
+
+def _split_days(payload: dict) -> dict[date, dict]:
+    """Break an Open-Meteo response into per-day cache entries."""
+    meta = {k: v for k, v in payload.items() if k != "daily"}
+    daily = payload.get("daily", {})
+    entries = {}
+    for i, day in enumerate(daily.get("time", [])):
+        values = {key: series[i] for key, series in daily.items() if i < len(series)}
+        entries[date.fromisoformat(day)] = {"meta": meta, "values": values}
+    return entries
+
+
+def _assemble(days: list[date], entries: dict[date, dict]) -> dict:
+    """Rebuild an Open-Meteo-shaped response from per-day entries."""
+    present = [entries[day] for day in days if day in entries]
+    if not present:
+        return {"daily": {}}
+    merged = dict(present[-1]["meta"])
+    keys = present[0]["values"].keys()
+    merged["daily"] = {key: [entry["values"].get(key) for entry in present] for key in keys}
+    return merged
+
+
+def slice_weather(data: dict, start_date: date, end_date: date) -> dict:
+    """Restrict an Open-Meteo-shaped response to the days in [start_date, end_date]."""
+    daily = data.get("daily", {})
+    times = daily.get("time", [])
+    lo = bisect_left(times, start_date.isoformat())
+    hi = bisect_right(times, end_date.isoformat())
+    sliced = dict(data)
+    sliced["daily"] = {key: series[lo:hi] for key, series in daily.items()}
+    return sliced
 
 
 async def get_weather_for_range(lat: float, lon: float, start_date: date, end_date: date) -> dict:
-    """Fetch weather data for a date range using archive or forecast endpoints as needed."""
-    today = datetime.now(tz=timezone.utc).date()
+    """
+    Fetch weather data for a date range using archive or forecast endpoints as needed.
+    Days for these (grid-snapped) coordinates are served from memory, then from the
+    weather_observations table; only the remaining gaps are fetched, concurrently,
+    and written back to both tiers. Days answered by a resilience fallback are
+    returned but not written back, and reported to track_fallbacks().
+    """
+    now = datetime.now(tz=timezone.utc)
+    today = now.date()
+    lat, lon = snap_to_grid(lat, lon)
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+    entries: dict[date, dict] = {}
+    for day in days:
+        entry = _day_cache.get((lat, lon, day, DAILY_VARS))
+        if entry is not None:
+            entries[day] = entry
+    await _load_stored_days(lat, lon, days, entries, now)
+
+    requests = [
+        part
+        for run_start, run_end in _missing_runs(days, entries)
+        for part in _split_at_today(run_start, run_end, today)
+    ]
+    payloads = await asyncio.gather(
+        *(_batcher.fetch(url, lat, lon, start, end, DAILY_VARS) for url, start, end in requests)
+    )
 
-    if end_date <= today:
-        return await _fetch(ARCHIVE_URL, lat, lon, start_date, end_date)
-    elif start_date > today:
-        return await _fetch(FORECAST_URL, lat, lon, start_date, end_date)
-    else:
-        # Spans today, split at today
-        past_data = await _fetch(ARCHIVE_URL, lat, lon, start_date, today)
-        from datetime import timedelta
-        future_start = today + timedelta(days=1)
-        future_data = await _fetch(FORECAST_URL, lat, lon, future_start, end_date)
-        merged = dict(past_data)
-        merged["daily"] = _merge_daily(past_data["daily"], future_data["daily"])
-        return merged
+    fetched: dict[date, dict] = {}
+    for payload, stale in payloads:
+        if stale:
+            # Possibly minutes old: caching or storing it as fetched now would outlive its data
+            entries.update(_split_days(payload))
+            resilience.report_fallbacks(("open_meteo",))
+        else:
+            fetched.update(_split_days(payload))
+    for day, entry in fetched.items():
+        _day_cache.set((lat, lon, day, DAILY_VARS), entry, ttl=_remaining_ttl(day, now, now))
+        entries[day] = entry
+    await weather_store.save_days(lat, lon, fetched)
+
+    return _assemble(days, entries)
+
+
+async def get_hourly_for_range(lat: float, lon: float, start_date: date, end_date: date) -> dict:
+    """
+    Fetch hourly series (HOURLY_VARS) for a date range, with Unix timestamps.
+    Archive and forecast parts are fetched concurrently and concatenated.
+    """
+    today = datetime.now(tz=timezone.utc).date()
+    lat, lon = snap_to_grid(lat, lon)
+    hourly_params = {"hourly": HOURLY_VARS, "timeformat": "unixtime"}
+    fetched = await asyncio.gather(
+        *(
+            _fetch_many(url, [(lat, lon)], start, end, variables="", extra_params=hourly_params)
+            for url, start, end in _split_at_today(start_date, end_date, today)
+        )
+    )
+    if any(stale for _, stale in fetched):
+        resilience.report_fallbacks(("open_meteo",))
+    payloads = [results[0] for results, _ in fetched]
+    merged = {k: v for k, v in payloads[0].items() if k not in ("daily", "daily_units")}
+    hourly: dict[str, list] = {}
+    for payload in payloads:
+        for key, series in payload.get("hourly", {}).items():
+            hourly.setdefault(key, []).extend(series)
+    merged["hourly"] = hourly
+    return merged
@@ -0,0 +1,37 @@
+"""
+WeatherQueryResponse rendered as JSON by PostgreSQL, for reads that return stored
+rows as-is without loading them into Python.
+"""
+from itertools import chain
+
+from sqlalchemy import DateTime, Float, Numeric, Text, case, cast, func, literal_column
+
+from app.models.weather_query import WeatherQuery
+from app.schemas.weather_query import WeatherQueryResponse
+
+
+def _json_field(name: str):
+    column = getattr(WeatherQuery, name)
+    # Match the response model's encoding: floats rather than Numeric's trailing zeros
+    # (40.712800), and UTC timestamps with a Z suffix rather than +00:00, whose
+    # fraction is omitted when it is zero
+    if isinstance(column.type, Numeric):
+        return cast(column, Float)
+    if isinstance(column.type, DateTime):
+        utc = func.timezone("UTC", column)
+        return case(
+            (func.date_trunc("second", utc) == utc, func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS"Z"')),
+            else_=func.to_char(utc, 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
+        )
+    return column
+
+
+# weather_data is spliced in as stored, so reads never decode, validate or re-encode it
+RESPONSE_JSON = cast(
+    func.json_build_object(
+        *chain.from_iterable(
+            (literal_column(f"'{name}'"), _json_field(name)) for name in WeatherQueryResponse.model_fields
+        )
+    ),
+    Text,
+)
@@ -0,0 +1,118 @@
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.cache import TTLCache
+from app.services.table_versions import get_version
+
+# (table version, filters) -> response; a write bumps the version, so old keys just age out
+_cache = TTLCache(max_entries=256, ttl=None)
+
+
+def _series(key: str) -> str:
+    return (
+        f"CASE WHEN jsonb_typeof(q.weather_data->'daily'->'{key}') = 'array' "
+        f"THEN q.weather_data->'daily'->'{key}' ELSE '[]'::jsonb END"
+    )
+
+
+# One row per (location, day) across all saved queries; where queries overlap, the most
+# recently written one wins so shared days are not counted twice.
+_DAYS_CTE = f"""
+WITH expanded AS (
+    SELECT
+        q.id,
+        CASE WHEN :by_location THEN q.resolved_location END AS location,
+        t.day::date AS day,
+        ({_series("temperature_2m_max")}->>(t.idx::int - 1))::float AS temp_max,
+        ({_series("temperature_2m_min")}->>(t.idx::int - 1))::float AS temp_min,
+        ({_series("precipitation_sum")}->>(t.idx::int - 1))::float AS precipitation,
+        ({_series("weathercode")}->>(t.idx::int - 1))::float::int AS weathercode,
+        row_number() OVER (
+            PARTITION BY q.resolved_location, t.day ORDER BY q.updated_at DESC, q.id DESC
+        ) AS rn
+    FROM weather_queries AS q
+    CROSS JOIN LATERAL jsonb_array_elements_text({_series("time")}) WITH ORDINALITY AS t(day, idx)
+    -- Literal case-insensitive substring match: % and _ in the filter are not wildcards
+    WHERE (CAST(:location AS text) IS NULL OR strpos(lower(q.resolved_location), lower(CAST(:location AS text))) > 0)
+      AND (CAST(:start_date AS date) IS NULL OR q.end_date >= CAST(:start_date AS date))
+      AND (CAST(:end_date AS date) IS NULL OR q.start_date <= CAST(:end_date AS date))
+),
+days AS (
+    SELECT *, CASE WHEN :period = 'all' THEN NULL ELSE date_trunc(:period, day)::date END AS period
+    FROM expanded
+    WHERE (CAST(:start_date AS date) IS NULL OR day >= CAST(:start_date AS date))
+      AND (CAST(:end_date AS date) IS NULL OR day <= CAST(:end_date AS date))
+)
+"""
+
+# Totals and the weathercode histogram come from one statement so both see the same snapshot
+_STATS_SQL = text(
+    _DAYS_CTE
+    + """,
+histogram AS (
+    SELECT location, period, jsonb_object_agg(weathercode, n) AS weathercode_histogram
+    FROM (
+        SELECT location, period, weathercode, count(*) AS n
+        FROM days
+        WHERE rn = 1 AND weathercode IS NOT NULL
+        GROUP BY location, period, weathercode
+    ) AS codes
+    GROUP BY location, period
+)
+SELECT
+    g.*,
+    coalesce(h.weathercode_histogram, '{}'::jsonb) AS weathercode_histogram
+FROM (
+    SELECT
+        location,
+        period,
+        count(DISTINCT id) AS queries,
+        count(*) FILTER (WHERE rn = 1) AS days,
+        round(avg(temp_max) FILTER (WHERE rn = 1)::numeric, 2)::float AS temp_max_mean,
+        round(avg(temp_min) FILTER (WHERE rn = 1)::numeric, 2)::float AS temp_min_mean,
+        round(sum(precipitation) FILTER (WHERE rn = 1)::numeric, 2)::float AS precipitation_total
+    FROM days
+    GROUP BY location, period
+) AS g
+LEFT JOIN histogram AS h
+    ON h.location IS NOT DISTINCT FROM g.location AND h.period IS NOT DISTINCT FROM g.period
+ORDER BY g.location NULLS FIRST, g.period NULLS FIRST
+"""
+)
+
+
+def stats() -> dict:
+    return _cache.stats()
+
+
+async def compute_stats(
+    db: AsyncSession,
+    period: str,
+    by_location: bool,
+    location: str | None,
+    start_date: date | None,
+    end_date: date | None,
+) -> dict:
+    """
+    Aggregate saved weather per location and calendar period inside PostgreSQL.
+    Results are cached per filter set until the next write to weather_queries.
+    """
+    version, _ = await get_version(db)
+    key = (version, period, by_location, location, start_date, end_date)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    params = {
+        "period": period,
+        "by_location": by_location,
+        "location": location,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+    groups = [dict(row) for row in (await db.execute(_STATS_SQL, params)).mappings()]
+    result = {"version": version, "period": period, "groups": groups}
+    _cache.set(key, result)
+    return result
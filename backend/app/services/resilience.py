@@ -0,0 +1,286 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable
+
+import httpx
+
+from app.config import settings
+from app.services import metrics
+from app.services.cache import TTLCache
+from app.services.http_clients import get_client
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+# Upstreams that answered with a stale fallback during the current track_fallbacks() block
+_fallbacks: ContextVar[set[str] | None] = ContextVar("resilience_fallbacks", default=None)
+
+HEDGES = metrics.register(
+    metrics.Counter("upstream_hedges_total", "Hedged second attempts by which attempt answered.", ("upstream", "winner"))
+)
+REJECTED = metrics.register(
+    metrics.Counter("upstream_circuit_rejections_total", "Calls refused while a circuit was open.", ("upstream",))
+)
+FALLBACKS = metrics.register(
+    metrics.Counter("upstream_stale_fallbacks_total", "Last good responses served instead of an error.", ("upstream",))
+)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker over a sliding time window. Opens when the error rate crosses
+    BREAKER_ERROR_RATE (given enough calls), then after BREAKER_OPEN_SECONDS lets a
+    single probe through: success closes it, failure re-opens it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._probing = False
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - settings.BREAKER_WINDOW_SECONDS
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= settings.BREAKER_OPEN_SECONDS:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record(self, ok: bool) -> None:
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if ok:
+                self.state = CLOSED
+                self._outcomes.clear()
+            else:
+                self.state, self.opened_at = OPEN, now
+            return
+        self._outcomes.append((now, ok))
+        self._trim(now)
+        failures = sum(1 for _, success in self._outcomes if not success)
+        if (
+            self.state == CLOSED
+            and len(self._outcomes) >= settings.BREAKER_MIN_REQUESTS
+            and failures / len(self._outcomes) >= settings.BREAKER_ERROR_RATE
+        ):
+            self.state, self.opened_at = OPEN, now
+
+    def release_probe(self) -> None:
+        self._probing = False
+
+    def error_rate(self) -> float:
+        self._trim(time.monotonic())
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+
+class _Upstream:
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = CircuitBreaker(name)
+        self.latencies: deque[float] = deque(maxlen=settings.HEDGE_LATENCY_SAMPLES)
+        self.calls = 0
+        self.hedges = 0
+        # request key -> (stored at, last good response), served while the upstream is failing
+        self.last_good = TTLCache(
+            max_entries=settings.RESILIENCE_FALLBACK_MAX_ENTRIES, ttl=settings.RESILIENCE_FALLBACK_MAX_AGE_SECONDS
+        )
+        self.hedgeable = name in {u.strip() for u in settings.HEDGE_UPSTREAMS.split(",")}
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging: the configured latency percentile of recent calls."""
+        if not (settings.HEDGE_ENABLED and self.hedgeable) or len(self.latencies) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        if self.hedges >= settings.HEDGE_MAX_RATIO * self.calls:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * settings.HEDGE_PERCENTILE / 100))
+        return max(ordered[index], settings.HEDGE_MIN_DELAY_MS / 1000)
+
+
+_upstreams: dict[str, _Upstream] = {}
+
+
+def _upstream(name: str) -> _Upstream:
+    upstream = _upstreams.get(name)
+    if upstream is None:
+        upstream = _upstreams[name] = _Upstream(name)
+    return upstream
+
+
+def _ok(response: httpx.Response) -> bool:
+    return response.status_code < 500
+
+
+def is_fallback(response: httpx.Response) -> bool:
+    """True when ``get`` answered with a stored response instead of a live one."""
+    return response.extensions.get("resilience_fallback", False)
+
+
+@contextmanager
+def track_fallbacks():
+    """Collect the upstreams that answered with a stale fallback inside the block."""
+    names: set[str] = set()
+    token = _fallbacks.set(names)
+    try:
+        yield names
+    finally:
+        _fallbacks.reset(token)
+
+
+def report_fallbacks(names: Iterable[str]) -> None:
+    """
+    Add upstreams to the enclosing track_fallbacks() block, for stale results that were
+    produced in another task (a coalesced or micro-batched call).
+    """
+    collected = _fallbacks.get()
+    if collected is not None:
+        collected.update(names)
+
+
+def _fallback(upstream: _Upstream, key) -> httpx.Response | None:
+    """A copy of the last good response for ``key`` marked as stale, or None."""
+    entry = upstream.last_good.get(key)
+    if entry is None:
+        return None
+    stored_at, response = entry
+    FALLBACKS.inc(upstream=upstream.name)
+    report_fallbacks((upstream.name,))
+    headers = httpx.Headers(response.headers)
+    headers["Age"] = str(int(time.monotonic() - stored_at))
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=response.content,
+        request=response.request,
+        extensions={"resilience_fallback": True},
+    )
+
+
+async def _timed_get(upstream: _Upstream, url: str, params: dict) -> httpx.Response:
+    started = time.perf_counter()
+    response = await get_client(upstream.name).get(url, params=params)
+    if _ok(response):
+        upstream.latencies.append(time.perf_counter() - started)
+    return response
+
+
+async def _hedged_get(upstream: _Upstream, url: str, params: dict) -> httpx.Response:
+    """
+    Send the request; if it has not answered within the hedge delay, send a second
+    copy and return whichever good response arrives first.
+    """
+    primary = asyncio.ensure_future(_timed_get(upstream, url, params))
+    attempts = [primary]
+    try:
+        delay = upstream.hedge_delay()
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait(attempts, timeout=delay)
+        if done:
+            return primary.result()
+
+        upstream.hedges += 1
+        attempts.append(asyncio.ensure_future(_timed_get(upstream, url, params)))
+        pending = set(attempts)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and _ok(task.result()):
+                    HEDGES.inc(upstream=upstream.name, winner="primary" if task is primary else "hedge")
+                    return task.result()
+        # Both attempts failed: surface the primary's outcome as-is
+        return primary.result()
+    finally:
+        for task in attempts:
+            if not task.done():
+                task.cancel()
+
+
+async def get(name: str, url: str, params: dict | None = None) -> httpx.Response:
+    """
+    GET through the shared client for ``name`` with hedging and a circuit breaker.
+    While the circuit is open, or when a call fails, the last good response for the
+    same request (at most RESILIENCE_FALLBACK_MAX_AGE_SECONDS old) is returned if there
+    is one, with an Age header and ``is_fallback()`` true; otherwise the error
+    propagates (CircuitOpenError is an httpx.TransportError).
+    """
+    params = params or {}
+    upstream = _upstream(name)
+    key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+    if not upstream.breaker.allow():
+        REJECTED.inc(upstream=name)
+        stale = _fallback(upstream, key)
+        if stale is not None:
+            return stale
+        raise CircuitOpenError(f"{name} circuit is open", request=httpx.Request("GET", url, params=params))
+
+    upstream.calls += 1
+    try:
+        response = await _hedged_get(upstream, url, params)
+    except httpx.RequestError:
+        upstream.breaker.record(False)
+        stale = _fallback(upstream, key)
+        if stale is None:
+            raise
+        return stale
+    except BaseException:
+        # Cancelled by the caller: not the upstream's fault, but release a half-open probe
+        upstream.breaker.release_probe()
+        raise
+
+    upstream.breaker.record(_ok(response))
+    if response.status_code < 400:
+        upstream.last_good.set(key, (time.monotonic(), response))
+    elif not _ok(response):
+        stale = _fallback(upstream, key)
+        if stale is not None:
+            return stale
+    return response
+
+
+def stats() -> dict:
+    return {
+        name: {
+            "state": u.breaker.state,
+            "error_rate": round(u.breaker.error_rate(), 4),
+            "calls": u.calls,
+            "hedges": u.hedges,
+        }
+        for name, u in _upstreams.items()
+    }
+
+
+def _samples():
+    for name, u in _upstreams.items():
+        for state in (CLOSED, OPEN, HALF_OPEN):
+            yield "upstream_circuit_state", {"upstream": name, "state": state}, int(u.breaker.state == state)
+        yield "upstream_error_rate", {"upstream": name}, u.breaker.error_rate()
+
+
+metrics.register_collector(
+    "resilience",
+    {
+        "upstream_circuit_state": ("gauge", "1 for the circuit breaker's current state per upstream, else 0."),
+        "upstream_error_rate": ("gauge", "Failed / total calls per upstream over the breaker window."),
+    },
+    _samples,
+)
@@ -0,0 +1,79 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.services import resilience
+
+_inflight: dict[Hashable, asyncio.Future] = {}
+_stats: dict[str, dict[str, int]] = {}
+
+
+def _default_key(args: tuple, kwargs: dict) -> Hashable:
+    """Normalize call arguments: collapse whitespace in strings, round floats to ~10 cm."""
+
+    def norm(value: Any) -> Hashable:
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, float):
+            return round(value, 6)
+        return value
+
+    return tuple(norm(a) for a in args), tuple(sorted((k, norm(v)) for k, v in kwargs.items()))
+
+
+def _forget(key: Hashable, future: asyncio.Future) -> None:
+    _inflight.pop(key, None)
+    # Mark the exception as retrieved in case every caller was cancelled
+    if not future.cancelled():
+        future.exception()
+
+
+async def _tracked(fn: Callable[[], Awaitable[Any]]) -> tuple[Any, frozenset[str]]:
+    # Runs in the first caller's context; keep the stale upstreams to hand to every caller
+    with resilience.track_fallbacks() as stale:
+        result = await fn()
+    return result, frozenset(stale)
+
+
+async def do(name: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run ``fn`` once for all concurrent callers sharing ``(name, key)``. Later callers
+    await the in-flight call; a cancelled caller does not cancel it for the others.
+    Every caller's track_fallbacks() block sees the upstreams that answered stale.
+    """
+    stats = _stats.setdefault(name, {"calls": 0, "deduplicated": 0})
+    stats["calls"] += 1
+    full_key = (name, key)
+    future = _inflight.get(full_key)
+    if future is not None:
+        stats["deduplicated"] += 1
+    else:
+        future = asyncio.ensure_future(_tracked(fn))
+        _inflight[full_key] = future
+        future.add_done_callback(functools.partial(_forget, full_key))
+    result, stale = await asyncio.shield(future)
+    resilience.report_fallbacks(stale)
+    return result
+
+
+def coalesce(fn: Callable | None = None, *, key: Callable[..., Hashable] | None = None):
+    """
+    Decorate an async function so identical concurrent calls share one awaitable.
+    ``key`` receives the call's arguments and returns the coalescing key.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key is not None else _default_key(args, kwargs)
+            return await do(name, call_key, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator(fn) if fn is not None else decorator
+
+
+def stats() -> dict[str, dict[str, int]]:
+    return {name: dict(counts) for name, counts in _stats.items()}
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.table_version import TableVersion
+
+
+async def get_version(db: AsyncSession, table_name: str = "weather_queries") -> tuple[int, datetime | None]:
+    """Return (version, last write time) for a table; (0, None) if it was never written."""
+    stmt = select(TableVersion.version, TableVersion.updated_at).where(TableVersion.table_name == table_name)
+    row = (await db.execute(stmt)).one_or_none()
+    return (row.version, row.updated_at) if row else (0, None)
@@ -2,11 +2,19 @@ import httpx
 from fastapi import HTTPException
 
 from app.config import settings
+from app.services import media_cache, resilience
+from app.services.singleflight import coalesce
 
-UNSPLASH_SEARCH_URL = "https://api.unsplash.com/search/photos"
+UNSPLASH_SEARCH_URL = settings.UNSPLASH_SEARCH_URL
 
 
+@coalesce
 async def get_photos(location: str) -> list:
+    """Cached Unsplash search for a resolved location name (stale-while-revalidate)."""
+    return await media_cache.cached("unsplash", location, lambda: _get_photos(location))
+
+
+async def _get_photos(location: str) -> list:
     """
     Search Unsplash for photos of the given location.
     Returns list of {url, alt, photographer, photographer_url}.
@@ -18,18 +26,17 @@ async def get_photos(location: str) -> list:
         "orientation": "landscape",
         "client_id": settings.UNSPLASH_ACCESS_KEY,
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            resp = await client.get(UNSPLASH_SEARCH_URL, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(
-                status_code=502,
-                detail=f"Unsplash API error: {e.response.text}",
-            )
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=502, detail=f"Unsplash API unreachable: {e}")
+    try:
+        resp = await resilience.get("unsplash", UNSPLASH_SEARCH_URL, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"Unsplash API error: {e.response.text}",
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=502, detail=f"Unsplash API unreachable: {e}")
 
     results = data.get("results", [])
     return [
@@ -0,0 +1,60 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.weather_query import WeatherQuery
+from app.services import geohash
+from app.services.local_geocoder import haversine_km
+from app.services.open_meteo import ARCHIVE_STABLE_DAYS, slice_weather, snap_to_grid
+
+# Candidates examined per lookup; the nearest usable one wins
+_MAX_CANDIDATES = 50
+
+
+async def find_nearby_weather(
+    db: AsyncSession, lat: float, lon: float, start_date: date, end_date: date
+) -> dict | None:
+    """
+    Return weather for [start_date, end_date] sliced from the nearest saved query within
+    WEATHER_REUSE_RADIUS_KM whose range covers it and whose data is still current:
+    either written within the forecast TTL, or every requested day had settled by then.
+    Only queries in the same provider grid cell qualify: others were fetched for a
+    different cell, which the model may answer differently.
+    """
+    radius = settings.WEATHER_REUSE_RADIUS_KM
+    if radius <= 0:
+        return None
+    fresh_after = datetime.now(tz=timezone.utc) - timedelta(seconds=settings.WEATHER_FORECAST_CACHE_TTL_SECONDS)
+    stmt = (
+        select(WeatherQuery.id, WeatherQuery.latitude, WeatherQuery.longitude)
+        .where(
+            or_(*(WeatherQuery.geohash.startswith(cell) for cell in geohash.covering_cells(lat, lon, radius))),
+            WeatherQuery.start_date <= start_date,
+            WeatherQuery.end_date >= end_date,
+            or_(
+                WeatherQuery.updated_at >= fresh_after,
+                func.date(WeatherQuery.updated_at) - ARCHIVE_STABLE_DAYS > end_date,
+            ),
+        )
+        .order_by(WeatherQuery.updated_at.desc())
+        .limit(_MAX_CANDIDATES)
+    )
+    cell = snap_to_grid(lat, lon)
+    candidates = [
+        (haversine_km(lat, lon, float(row.latitude), float(row.longitude)), row.id)
+        for row in await db.execute(stmt)
+        if snap_to_grid(row.latitude, row.longitude) == cell
+    ]
+    expected_days = (end_date - start_date).days + 1
+    for distance, query_id in sorted(candidates):
+        if distance > radius:
+            break
+        weather_data = await db.scalar(select(WeatherQuery.weather_data).where(WeatherQuery.id == query_id))
+        sliced = slice_weather(weather_data, start_date, end_date)
+        if len(sliced.get("daily", {}).get("time", [])) == expected_days:
+            # The shared cell, as a fresh fetch for these coordinates would report it
+            sliced["latitude"], sliced["longitude"] = cell
+            return sliced
+    return None
@@ -0,0 +1,71 @@
+import logging
+from datetime import date, datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import AsyncSessionLocal
+from app.models.weather_observation import WeatherObservation
+
+logger = logging.getLogger(__name__)
+
+# asyncpg caps a statement at 32767 bind parameters
+_UPSERT_CHUNK = 1000
+
+
+async def load_days(lat: float, lon: float, start: date, end: date) -> dict[date, dict]:
+    """Return stored days in [start, end] as {day: {"meta", "values", "fetched_at"}}."""
+    stmt = select(WeatherObservation).where(
+        WeatherObservation.latitude == lat,
+        WeatherObservation.longitude == lon,
+        WeatherObservation.day >= start,
+        WeatherObservation.day <= end,
+    )
+    try:
+        async with AsyncSessionLocal() as session:
+            rows = (await session.scalars(stmt)).all()
+    except Exception:
+        logger.warning("Weather store lookup failed for %s,%s", lat, lon, exc_info=True)
+        return {}
+    return {
+        row.day: {"meta": row.meta, "values": row.data, "fetched_at": row.fetched_at}
+        for row in rows
+    }
+
+
+async def save_days(lat: float, lon: float, entries: dict[date, dict]) -> None:
+    """Upsert fetched days, merging new variables into any already stored for that day."""
+    if not entries:
+        return
+    fetched_at = datetime.now(tz=timezone.utc)
+    rows = [
+        {
+            "latitude": lat,
+            "longitude": lon,
+            "day": day,
+            "data": entry["values"],
+            "meta": entry["meta"],
+            "fetched_at": fetched_at,
+        }
+        for day, entry in entries.items()
+    ]
+    try:
+        async with AsyncSessionLocal() as session:
+            for i in range(0, len(rows), _UPSERT_CHUNK):
+                stmt = insert(WeatherObservation).values(rows[i : i + _UPSERT_CHUNK])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[
+                        WeatherObservation.latitude,
+                        WeatherObservation.longitude,
+                        WeatherObservation.day,
+                    ],
+                    set_={
+                        "data": WeatherObservation.data.op("||")(stmt.excluded.data),
+                        "meta": stmt.excluded.meta,
+                        "fetched_at": stmt.excluded.fetched_at,
+                    },
+                )
+                await session.execute(stmt)
+            await session.commit()
+    except Exception:
+        logger.warning("Weather store write failed for %s,%s", lat, lon, exc_info=True)
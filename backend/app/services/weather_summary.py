@@ -0,0 +1,16 @@
+def _values(daily: dict, key: str) -> list[float]:
+    return [v for v in daily.get(key) or [] if isinstance(v, (int, float))]
+
+
+def summarize_weather(weather_data: dict) -> dict:
+    """Compute the per-row aggregate columns stored next to ``weather_data``."""
+    daily = weather_data.get("daily") or {}
+    temp_max = _values(daily, "temperature_2m_max")
+    temp_min = _values(daily, "temperature_2m_min")
+    precip = _values(daily, "precipitation_sum")
+    return {
+        "temp_max": max(temp_max) if temp_max else None,
+        "temp_min": min(temp_min) if temp_min else None,
+        "precipitation_total": round(sum(precip), 2) if precip else None,
+        "day_count": len(daily.get("time") or []),
+    }
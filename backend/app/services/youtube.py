@@ -2,11 +2,19 @@ import httpx
 from fastapi import HTTPException
 
 from app.config import settings
+from app.services import media_cache, resilience
+from app.services.singleflight import coalesce
 
-YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+YOUTUBE_SEARCH_URL = settings.YOUTUBE_SEARCH_URL
 
 
+@coalesce
 async def search_videos(location: str) -> list:
+    """Cached YouTube search for a resolved location name (stale-while-revalidate)."""
+    return await media_cache.cached("youtube", location, lambda: _search_videos(location))
+
+
+async def _search_videos(location: str) -> list:
     """
     Search YouTube for travel/weather videos about the given location.
     Returns list of {videoId, title, thumbnail, channelTitle}.
@@ -18,18 +26,17 @@ async def search_videos(location: str) -> list:
         "maxResults": 3,
         "key": settings.YOUTUBE_API_KEY,
     }
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            resp = await client.get(YOUTUBE_SEARCH_URL, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(
-                status_code=502,
-                detail=f"YouTube API error: {e.response.text}",
-            )
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=502, detail=f"YouTube API unreachable: {e}")
+    try:
+        resp = await resilience.get("youtube", YOUTUBE_SEARCH_URL, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(
+            status_code=502,
+            detail=f"YouTube API error: {e.response.text}",
+        )
+    except httpx.RequestError as e:
+        raise HTTPException(status_code=502, detail=f"YouTube API unreachable: {e}")
 
     items = data.get("items", [])
     return [
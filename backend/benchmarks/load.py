@@ -0,0 +1,175 @@
+"""
+Drive ``app.main:app`` in-process through a weighted mix of realistic requests.
+Import this module only after the stub server's environment has been applied.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.timing import summarize
+
+# Gazetteer hits resolve locally; the free-text ones go through the geocode cache / Gemini stub
+KNOWN_LOCATIONS = ["Paris", "London", "Tokyo", "New York", "10001", "48.8566, 2.3522", "Sydney", "Berlin"]
+FREE_TEXT_LOCATIONS = ["the city with the big tower in France", "where the 2008 olympics were held", "home of the golden gate bridge"]
+
+
+def _location(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.7:
+        return rng.choice(KNOWN_LOCATIONS)
+    if roll < 0.95:
+        return rng.choice(FREE_TEXT_LOCATIONS)
+    # A never-seen description forces a full geocode miss
+    return f"small town number {rng.randrange(1_000_000)}"
+
+
+def _date_range(rng: random.Random) -> tuple[date, date]:
+    today = date.today()
+    start = today - timedelta(days=rng.randrange(0, 365))
+    if rng.random() < 0.2:
+        start = today - timedelta(days=rng.randrange(0, 5))
+    end = min(start + timedelta(days=rng.randrange(0, 30)), today + timedelta(days=14))
+    return start, end
+
+
+async def _current(client, rng, ids):
+    return await client.get("/api/weather/current", params={"location": _location(rng)})
+
+
+async def _forecast(client, rng, ids):
+    return await client.get("/api/weather/forecast", params={"location": _location(rng)})
+
+
+async def _bundle(client, rng, ids):
+    return await client.get("/api/location/bundle", params={"location": _location(rng)})
+
+
+async def _create(client, rng, ids):
+    start, end = _date_range(rng)
+    resp = await client.post(
+        "/api/queries/",
+        json={"location": _location(rng), "start_date": start.isoformat(), "end_date": end.isoformat()},
+    )
+    if resp.status_code == 201:
+        ids.append(resp.json()["id"])
+    return resp
+
+
+async def _list_full(client, rng, ids):
+    return await client.get("/api/queries/", params={"limit": 20})
+
+
+async def _list_summary(client, rng, ids):
+    return await client.get("/api/queries/", params={"limit": 100, "view": "summary"})
+
+
+async def _get(client, rng, ids):
+    return await client.get(f"/api/queries/{rng.choice(ids) if ids else 0}")
+
+
+async def _stats(client, rng, ids):
+    return await client.get("/api/queries/stats", params={"period": rng.choice(["month", "year"])})
+
+
+async def _export_csv(client, rng, ids):
+    return await client.get("/api/export/", params={"format": "csv"})
+
+
+# name -> (weight, needs database, request)
+SCENARIOS = {
+    "weather_current": (20, False, _current),
+    "weather_forecast": (15, False, _forecast),
+    "location_bundle": (10, False, _bundle),
+    "query_create": (10, True, _create),
+    "query_list": (12, True, _list_full),
+    "query_list_summary": (10, True, _list_summary),
+    "query_get": (12, True, _get),
+    "query_stats": (6, True, _stats),
+    "export_csv": (5, True, _export_csv),
+}
+
+
+async def seed(client: httpx.AsyncClient, rng: random.Random, count: int) -> list[int]:
+    """Create ``count`` saved queries through the batch endpoint."""
+    ids = []
+    for offset in range(0, count, 500):
+        items = []
+        for _ in range(min(500, count - offset)):
+            start, end = _date_range(rng)
+            items.append({"location": rng.choice(KNOWN_LOCATIONS), "start_date": start.isoformat(), "end_date": end.isoformat()})
+        resp = await client.post("/api/queries/batch", json={"items": items}, timeout=300)
+        resp.raise_for_status()
+        ids += [r["record"]["id"] for r in resp.json()["results"] if r["ok"]]
+    return ids
+
+
+async def run_load(
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    use_db: bool = True,
+    seed_rows: int = 0,
+    rng_seed: int = 0,
+) -> dict:
+    from app.main import app
+
+    rng = random.Random(rng_seed)
+    scenarios = {name: s for name, s in SCENARIOS.items() if use_db or not s[1]}
+    names = list(scenarios)
+    weights = [scenarios[name][0] for name in names]
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    statuses: dict[str, int] = defaultdict(int)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            ids = await seed(client, rng, seed_rows) if use_db and seed_rows else []
+            remaining = warmup + requests
+            issued = 0
+            started_at = None
+
+            async def worker():
+                nonlocal remaining, issued, started_at
+                while remaining > 0:
+                    remaining -= 1
+                    issued += 1
+                    measured = issued > warmup
+                    if measured and started_at is None:
+                        started_at = time.perf_counter()
+                    name = rng.choices(names, weights)[0]
+                    t0 = time.perf_counter()
+                    try:
+                        resp = await scenarios[name][2](client, rng, ids)
+                        status = resp.status_code
+                    except httpx.HTTPError:
+                        status = 599
+                    elapsed = time.perf_counter() - t0
+                    if not measured:
+                        continue
+                    latencies[name].append(elapsed)
+                    statuses[str(status)] += 1
+                    if status >= 500:
+                        errors[name] += 1
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            wall = time.perf_counter() - started_at if started_at else 0.0
+
+    all_latencies = [x for values in latencies.values() for x in values]
+    return {
+        "config": {
+            "requests": requests,
+            "warmup": warmup,
+            "concurrency": concurrency,
+            "use_db": use_db,
+            "seed_rows": seed_rows,
+        },
+        "total": summarize(all_latencies, wall, sum(errors.values())),
+        "statuses": dict(sorted(statuses.items())),
+        "endpoints": {name: summarize(latencies[name], wall, errors[name]) for name in names if latencies[name]},
+    }
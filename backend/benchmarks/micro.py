@@ -0,0 +1,94 @@
+"""Micro-benchmarks of CPU-bound helpers on synthetic data (no network, no database)."""
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from benchmarks.timing import summarize
+
+
+def _weather_data(rng: random.Random, start: date, days: int) -> dict:
+    return {
+        "latitude": 48.85,
+        "longitude": 2.35,
+        "timezone": "Europe/Paris",
+        "daily": {
+            "time": [(start + timedelta(days=i)).isoformat() for i in range(days)],
+            "temperature_2m_max": [round(rng.uniform(40, 95), 1) for _ in range(days)],
+            "temperature_2m_min": [round(rng.uniform(10, 60), 1) for _ in range(days)],
+            "weathercode": [rng.choice([0, 1, 2, 3, 61, 80]) for _ in range(days)],
+            "precipitation_sum": [round(rng.random(), 2) for _ in range(days)],
+        },
+    }
+
+
+def _records(rng: random.Random, count: int, days: int) -> list[dict]:
+    now = datetime.now(tz=timezone.utc)
+    records = []
+    for i in range(count):
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(300))
+        records.append({
+            "id": i + 1,
+            "location": f"Location {i}",
+            "resolved_location": f"Resolved Location {i}",
+            "latitude": rng.uniform(-70, 70),
+            "longitude": rng.uniform(-180, 180),
+            "start_date": start,
+            "end_date": start + timedelta(days=days - 1),
+            "weather_data": _weather_data(rng, start, days),
+            "created_at": now,
+            "updated_at": now,
+        })
+    return records
+
+
+def _owm_forecast(rng: random.Random) -> dict:
+    first = int(time.time()) // 10800 * 10800
+    return {
+        "city": {"name": "Bench City", "timezone": rng.choice([-18000, 0, 3600, 19800, 32400])},
+        "list": [
+            {
+                "dt": first + i * 10800,
+                "main": {"temp": rng.uniform(40, 90), "humidity": rng.randrange(20, 100)},
+                "weather": [{"icon": "01d", "description": "clear sky"}],
+            }
+            for i in range(40)
+        ],
+    }
+
+
+def _time(fn, iterations: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_micro(iterations: int = 50, records: int = 200, days: int = 30, rng_seed: int = 0) -> dict:
+    from app.services import exporter, open_meteo
+    from app.services.openweather import collapse_forecast
+
+    rng = random.Random(rng_seed)
+    rows = _records(rng, records, days)
+    forecast_payload = _owm_forecast(rng)
+
+    year_start = date(2024, 1, 1)
+    year = [year_start + timedelta(days=i) for i in range(366)]
+    entries = open_meteo._split_days(_weather_data(rng, year_start, len(year)))
+    assembled = open_meteo._assemble(year, entries)
+
+    results = {
+        "exporter.to_csv": _time(lambda: exporter.to_csv(rows), iterations),
+        "exporter.to_xml": _time(lambda: exporter.to_xml(rows), iterations),
+        "exporter.to_json": _time(lambda: exporter.to_json(rows), iterations),
+        # PDF rendering is an order of magnitude slower; keep the run time bounded
+        "exporter.to_pdf": _time(lambda: exporter.to_pdf(rows), max(1, iterations // 10)),
+        "openweather.collapse_forecast": _time(lambda: collapse_forecast(forecast_payload), iterations * 20),
+        "open_meteo.assemble_366_days": _time(lambda: open_meteo._assemble(year, entries), iterations * 20),
+        "open_meteo.slice_weather": _time(
+            lambda: open_meteo.slice_weather(assembled, date(2024, 3, 1), date(2024, 9, 30)), iterations * 20
+        ),
+    }
+    return {"config": {"iterations": iterations, "records": records, "days_per_record": days}, "results": results}
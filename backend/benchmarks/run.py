@@ -0,0 +1,131 @@
+"""
+Benchmark entry point. From the backend directory:
+
+    python -m benchmarks.run --suite all --requests 2000 --concurrency 32 --output bench.json
+
+Upstream calls go to local stubs; the database is whatever DATABASE_URL (or
+--database-url) points at, migrated with --migrate. Use --no-db to skip the
+database-backed scenarios.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks.stubs import SERVICES, Fault, StubConfig, StubServer
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _parse_fault(spec: str, faults: dict[str, Fault]) -> tuple[str, Fault]:
+    """``service:latency_ms=200,error_rate=0.05`` -> (service, Fault) layered over ``faults``."""
+    service, _, options = spec.partition(":")
+    if service not in SERVICES:
+        raise argparse.ArgumentTypeError(f"unknown service {service!r}; expected one of {', '.join(SERVICES)}")
+    values = {}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        if key not in ("latency_ms", "jitter_ms", "error_rate", "slow_rate", "slow_ms"):
+            raise argparse.ArgumentTypeError(f"unknown fault option {key!r}")
+        values[key] = float(value)
+    return service, replace(faults[service], **values)
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load and micro-benchmarks against local upstream stubs")
+    parser.add_argument("--suite", choices=["load", "micro", "all"], default="all")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured load requests")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests issued first")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed-rows", type=int, default=200, help="Saved queries created before the load run")
+    parser.add_argument("--iterations", type=int, default=50, help="Micro-benchmark iterations")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Default stub latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Default +/- latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Default fraction of 503 responses")
+    parser.add_argument(
+        "--fault",
+        action="append",
+        default=[],
+        metavar="SERVICE:KEY=VALUE,...",
+        help="Per-service override, e.g. open_meteo:latency_ms=300,error_rate=0.05,slow_rate=0.02,slow_ms=3000",
+    )
+    parser.add_argument("--database-url", help="Overrides DATABASE_URL for the run")
+    parser.add_argument("--migrate", action="store_true", help="Run 'alembic upgrade head' first")
+    parser.add_argument("--no-db", action="store_true", help="Skip database-backed scenarios")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed for request mix and stub data")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    base = Fault(args.latency_ms, args.jitter_ms, args.error_rate)
+    faults = {name: base for name in SERVICES}
+    for spec in args.fault:
+        service, fault = _parse_fault(spec, faults)
+        faults[service] = fault
+
+    stubs = StubServer(StubConfig(faults=faults, seed=args.seed))
+    stubs.start()
+    # Settings are read at import time, so the environment must be in place before app is imported
+    os.environ.update(stubs.env())
+    os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    logging.basicConfig(level=logging.ERROR)
+
+    try:
+        if args.migrate and not args.no_db:
+            subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, check=True)
+
+        report = {
+            "meta": {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "faults": {name: vars(fault) for name, fault in faults.items()},
+            }
+        }
+        if args.suite in ("micro", "all"):
+            from benchmarks.micro import run_micro
+
+            report["micro"] = run_micro(iterations=args.iterations, rng_seed=args.seed)
+        if args.suite in ("load", "all"):
+            from benchmarks.load import run_load
+
+            report["load"] = asyncio.run(
+                run_load(
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                    warmup=args.warmup,
+                    use_db=not args.no_db,
+                    seed_rows=args.seed_rows,
+                    rng_seed=args.seed,
+                )
+            )
+    finally:
+        stubs.stop()
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Local stand-ins for every upstream the app calls (Open-Meteo, OpenWeatherMap,
+Unsplash, YouTube, Gemini), served from one uvicorn instance under per-service
+path prefixes. Each service gets configurable latency, jitter and error rate.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+SERVICES = ("open_meteo", "openweather", "unsplash", "youtube", "gemini")
+
+
+@dataclass
+class Fault:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # Fraction of calls that stall for slow_ms instead (a latency tail, for hedging)
+    slow_rate: float = 0.0
+    slow_ms: float = 0.0
+
+
+@dataclass
+class StubConfig:
+    faults: dict[str, Fault] = field(default_factory=lambda: {name: Fault() for name in SERVICES})
+    seed: int = 0
+
+
+def _coords_for(text: str) -> tuple[float, float]:
+    digest = hashlib.sha256(text.casefold().encode("utf-8")).digest()
+    lat = int.from_bytes(digest[:4], "big") / 2**32 * 140 - 70
+    lon = int.from_bytes(digest[4:8], "big") / 2**32 * 360 - 180
+    return round(lat, 4), round(lon, 4)
+
+
+def _open_meteo_point(lat: float, lon: float, params: dict) -> dict:
+    start = date.fromisoformat(params["start_date"])
+    end = date.fromisoformat(params["end_date"])
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    rng = random.Random(f"{lat},{lon},{start}")
+    payload = {
+        "latitude": lat,
+        "longitude": lon,
+        "generationtime_ms": 0.1,
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "timezone_abbreviation": "GMT",
+        "elevation": 10.0,
+    }
+    daily_vars = [v for v in params.get("daily", "").split(",") if v]
+    if daily_vars:
+        generators = {
+            "temperature_2m_max": lambda: round(rng.uniform(40, 95), 1),
+            "temperature_2m_min": lambda: round(rng.uniform(10, 60), 1),
+            "weathercode": lambda: rng.choice([0, 1, 2, 3, 45, 61, 63, 71, 80, 95]),
+            "precipitation_sum": lambda: round(max(0.0, rng.gauss(0.05, 0.2)), 2),
+        }
+        payload["daily_units"] = {"time": "iso8601", **{v: "" for v in daily_vars}}
+        payload["daily"] = {
+            "time": [d.isoformat() for d in days],
+            **{v: [generators.get(v, rng.random)() for _ in days] for v in daily_vars},
+        }
+    hourly_vars = [v for v in params.get("hourly", "").split(",") if v]
+    if hourly_vars:
+        first = int(datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc).timestamp())
+        count = 24 * len(days)
+        payload["hourly_units"] = {"time": "unixtime", **{v: "" for v in hourly_vars}}
+        payload["hourly"] = {
+            "time": [first + i * 3600 for i in range(count)],
+            **{v: [round(rng.uniform(0, 100), 1) for _ in range(count)] for v in hourly_vars},
+        }
+    return payload
+
+
+def build_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Upstream stubs")
+    rng = random.Random(config.seed)
+
+    async def inject(service: str) -> JSONResponse | None:
+        fault = config.faults[service]
+        delay = fault.latency_ms + (rng.uniform(-fault.jitter_ms, fault.jitter_ms) if fault.jitter_ms else 0)
+        if fault.slow_rate and rng.random() < fault.slow_rate:
+            delay = fault.slow_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if fault.error_rate and rng.random() < fault.error_rate:
+            return JSONResponse({"error": f"injected {service} failure"}, status_code=503)
+        return None
+
+    async def open_meteo(request: Request):
+        if (error := await inject("open_meteo")) is not None:
+            return error
+        params = dict(request.query_params)
+        lats = [float(v) for v in params["latitude"].split(",")]
+        lons = [float(v) for v in params["longitude"].split(",")]
+        points = [_open_meteo_point(lat, lon, params) for lat, lon in zip(lats, lons)]
+        return points if len(points) > 1 else points[0]
+
+    app.add_api_route("/open-meteo/archive", open_meteo)
+    app.add_api_route("/open-meteo/forecast", open_meteo)
+
+    @app.get("/openweather/weather")
+    async def current(lat: float, lon: float):
+        if (error := await inject("openweather")) is not None:
+            return error
+        return {
+            "coord": {"lat": lat, "lon": lon},
+            "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+            "main": {"temp": 68.2, "feels_like": 67.5, "temp_min": 64.0, "temp_max": 72.1, "humidity": 54},
+            "wind": {"speed": 6.3, "deg": 220},
+            "name": "Stub City",
+            "timezone": 0,
+            "dt": int(time.time()),
+        }
+
+    @app.get("/openweather/forecast")
+    async def forecast(lat: float, lon: float, cnt: int = 40):
+        if (error := await inject("openweather")) is not None:
+            return error
+        now = int(time.time()) // 10800 * 10800
+        offset = int(round(lon / 15)) * 3600
+        return {
+            "city": {"name": "Stub City", "coord": {"lat": lat, "lon": lon}, "timezone": offset},
+            "list": [
+                {
+                    "dt": now + i * 10800,
+                    "main": {"temp": 60 + (i * 7) % 15, "humidity": 40 + (i * 11) % 50},
+                    "weather": [{"icon": "02d", "description": "few clouds"}],
+                }
+                for i in range(cnt)
+            ],
+        }
+
+    @app.get("/unsplash/search/photos")
+    async def photos(query: str, per_page: int = 3):
+        if (error := await inject("unsplash")) is not None:
+            return error
+        return {
+            "results": [
+                {
+                    "urls": {"regular": f"https://images.example/{i}.jpg"},
+                    "alt_description": f"{query} view {i}",
+                    "user": {"name": "Stub Photographer", "links": {"html": "https://example.com"}},
+                }
+                for i in range(per_page)
+            ]
+        }
+
+    @app.get("/youtube/search")
+    async def videos(q: str, maxResults: int = 3):
+        if (error := await inject("youtube")) is not None:
+            return error
+        return {
+            "items": [
+                {
+                    "id": {"videoId": f"stub{i}"},
+                    "snippet": {
+                        "title": f"{q} #{i}",
+                        "thumbnails": {"high": {"url": f"https://img.example/{i}.jpg"}},
+                        "channelTitle": "Stub Channel",
+                    },
+                }
+                for i in range(maxResults)
+            ]
+        }
+
+    @app.post("/gemini/{version}/models/{method:path}")
+    async def generate(version: str, method: str, request: Request):
+        if (error := await inject("gemini")) is not None:
+            return error
+        body = await request.json()
+        prompt = body["contents"][0]["parts"][0]["text"]
+        query = prompt.rsplit("Input:", 1)[-1].strip()
+        lat, lon = _coords_for(query)
+        answer = json.dumps({"name": query.title(), "lat": lat, "lon": lon})
+        return {
+            "candidates": [
+                {"content": {"role": "model", "parts": [{"text": answer}]}, "finishReason": "STOP", "index": 0}
+            ],
+            "modelVersion": "stub",
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubServer:
+    """Run the stub app on a background thread; ``env()`` points the app's settings at it."""
+
+    def __init__(self, config: StubConfig, port: int | None = None):
+        self.port = port or _free_port()
+        self._server = uvicorn.Server(
+            uvicorn.Config(build_app(config), host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def env(self) -> dict[str, str]:
+        base = self.base_url
+        return {
+            "OPEN_METEO_ARCHIVE_URL": f"{base}/open-meteo/archive",
+            "OPEN_METEO_FORECAST_URL": f"{base}/open-meteo/forecast",
+            "OPENWEATHER_BASE_URL": f"{base}/openweather",
+            "UNSPLASH_SEARCH_URL": f"{base}/unsplash/search/photos",
+            "YOUTUBE_SEARCH_URL": f"{base}/youtube/search",
+            "GEMINI_BASE_URL": f"{base}/gemini",
+            "GEMINI_API_KEY": "stub",
+            "OPENWEATHER_API_KEY": "stub",
+            "UNSPLASH_ACCESS_KEY": "stub",
+            "YOUTUBE_API_KEY": "stub",
+        }
+
+    def start(self) -> None:
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Stub server failed to start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
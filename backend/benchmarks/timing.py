@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def summarize(latencies_s: list[float], elapsed_s: float | None = None, errors: int = 0) -> dict:
+    """Latency percentiles in milliseconds, plus throughput when wall time is known."""
+    ms = np.asarray(latencies_s, dtype=np.float64) * 1000
+    summary = {"count": int(ms.size), "errors": errors}
+    if ms.size:
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        summary.update(
+            mean_ms=round(float(ms.mean()), 3),
+            p50_ms=round(float(p50), 3),
+            p95_ms=round(float(p95), 3),
+            p99_ms=round(float(p99), 3),
+            max_ms=round(float(ms.max()), 3),
+        )
+    if elapsed_s:
+        summary["throughput_per_s"] = round(ms.size / elapsed_s, 2)
+    return summary
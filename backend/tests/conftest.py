@@ -0,0 +1,35 @@
+"""
+Tests that touch the database run against DATABASE_URL with migrations applied
+(``alembic upgrade head``) and are skipped when it is unreachable. Rows they create
+are dated well before any real data and deleted afterwards.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.database import engine
+
+
+def run(coro):
+    """Run a coroutine on a fresh loop, then drop pooled connections bound to it."""
+
+    async def main():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(scope="session")
+def database():
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        run(ping())
+    except Exception as exc:
+        pytest.skip(f"database unavailable: {exc}")
@@ -0,0 +1,67 @@
+from app.services import cache
+from app.services.cache import TTLCache
+
+
+def test_lru_eviction_by_entries():
+    c = TTLCache(max_entries=2, ttl=None)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert (c.get("a"), c.get("c")) == (1, 3)
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    c = TTLCache(max_entries=10, ttl=5, max_bytes=100)
+    c.set("a", b"12345")
+    c.set("b", b"12", ttl=None)
+    now[0] += 5
+
+    assert c.get("a") is None
+    assert c.get("b") == b"12"
+    assert c.bytes == 2
+    assert c.stats() == {"entries": 1, "hits": 1, "misses": 1, "hit_ratio": 0.5, "bytes": 2}
+
+
+def test_byte_budget_evicts_least_recently_used():
+    c = TTLCache(max_entries=10, ttl=None, max_bytes=10)
+    c.set("a", b"12345")
+    c.set("b", b"1234")
+    c.get("a")
+    c.set("c", b"123")
+
+    assert c.get("b") is None
+    assert (c.get("a"), c.get("c")) == (b"12345", b"123")
+    assert c.bytes == 8
+
+
+def test_value_larger_than_budget_is_not_stored():
+    c = TTLCache(max_entries=10, ttl=None, max_bytes=10)
+    c.set("a", b"123")
+    c.set("a", b"x" * 11)
+    c.set("b", b"y" * 11)
+
+    assert c.get("a") is None
+    assert c.get("b") is None
+    assert c.bytes == 0
+
+
+def test_replacing_pop_and_clear_keep_byte_total():
+    c = TTLCache(max_entries=10, ttl=None, max_bytes=100, sizeof=lambda entry: len(entry[1]))
+    c.set("a", ("headers", b"12345"))
+    c.set("a", ("headers", b"1"))
+    c.set("b", ("headers", b"12"))
+    assert c.bytes == 3
+
+    c.pop("a")
+    assert c.bytes == 2
+    c.clear()
+    assert c.bytes == 0
+
+
+def test_stats_report_bytes_only_with_a_budget():
+    assert "bytes" not in TTLCache(max_entries=1, ttl=None).stats()
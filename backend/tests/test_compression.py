@@ -0,0 +1,162 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.services import compression, conditional
+from app.services.cache import TTLCache
+from app.services.compression import CompressionMiddleware
+
+ETAG = conditional.make_etag("test", 1)
+BODY = json.dumps({"values": list(range(1000))}).encode()
+
+requires_brotli = pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(compression, "_cache", TTLCache(max_entries=10, ttl=None, max_bytes=1 << 20))
+    renders = []
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/versioned")
+    async def versioned(request: Request):
+        # The shape of the ETagged routes: 304, then the cached body, then render
+        if (not_modified := conditional.not_modified(request, ETAG)) is not None:
+            return not_modified
+        if (cached := compression.cached_response(request, ETAG)) is not None:
+            return cached
+        renders.append(1)
+        headers = {**conditional.validators(ETAG), "X-Next-Cursor": "abc", "X-Request": "per-request"}
+        return Response(BODY, media_type="application/json", headers=headers)
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"ok": true}', media_type="application/json", headers={"ETag": ETAG})
+
+    @app.get("/pdf")
+    async def pdf():
+        return Response(BODY, media_type="application/pdf", headers={"ETag": ETAG})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+
+        return StreamingResponse(chunks(), media_type="text/csv")
+
+    with TestClient(app) as test_client:
+        test_client.renders = renders
+        yield test_client
+
+
+def _raw(client: TestClient, path: str, **headers: str):
+    """GET without letting the client decode the body."""
+    with client.stream("GET", path, headers={k.replace("_", "-"): v for k, v in headers.items()}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_negotiate_picks_highest_q_then_server_preference():
+    assert compression.negotiate(None) is None
+    assert compression.negotiate("identity") is None
+    assert compression.negotiate("gzip") == "gzip"
+    assert compression.negotiate("gzip;q=0") is None
+    assert compression.negotiate("gzip;q=bogus") is None
+    assert compression.negotiate("*;q=0.5, gzip;q=0") != "gzip"
+
+
+@requires_brotli
+def test_negotiate_prefers_brotli_on_ties_only():
+    assert compression.negotiate("gzip, br") == "br"
+    assert compression.negotiate("br;q=0.5, gzip") == "gzip"
+    assert compression.negotiate("*") == "br"
+
+
+def test_compressible_media_types():
+    assert compression._compressible("application/json")
+    assert compression._compressible("text/csv; charset=utf-8")
+    assert compression._compressible("application/problem+json")
+    assert not compression._compressible("application/pdf")
+    assert not compression._compressible(None)
+
+
+def test_compressed_200_carries_weak_etag_and_vary(client):
+    response, raw = _raw(client, "/versioned", accept_encoding="gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == "W/" + ETAG
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw) == BODY
+
+
+def test_identity_200_keeps_strong_etag(client):
+    response, raw = _raw(client, "/versioned", accept_encoding="identity")
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == ETAG
+    assert raw == BODY
+
+
+def test_small_and_precompressed_bodies_pass_through(client):
+    for path in ("/small", "/pdf"):
+        response, _ = _raw(client, path, accept_encoding="gzip")
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == ETAG
+
+
+def test_streaming_body_is_compressed_without_length(client):
+    response, raw = _raw(client, "/stream", accept_encoding="gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw) == BODY * 3
+
+
+def test_304_uses_the_weak_etag_of_the_compressed_200(client):
+    response, _ = _raw(client, "/versioned", accept_encoding="gzip", if_none_match="W/" + ETAG)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == "W/" + ETAG
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_304_keeps_strong_etag_for_a_client_holding_the_identity_body(client):
+    response, _ = _raw(client, "/versioned", accept_encoding="gzip", if_none_match=ETAG)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+
+
+def test_cached_body_is_replayed_with_entity_headers_only(client):
+    first, first_raw = _raw(client, "/versioned", accept_encoding="gzip")
+    second, second_raw = _raw(client, "/versioned", accept_encoding="gzip")
+
+    assert client.renders == [1]
+    assert second_raw == first_raw
+    for header in ("content-type", "content-encoding", "etag", "cache-control", "x-next-cursor"):
+        assert second.headers[header] == first.headers[header]
+    assert "x-request" not in second.headers
+    assert second.headers["vary"] == "Accept-Encoding"
+    assert int(second.headers["content-length"]) == len(second_raw)
+
+
+def test_cache_is_per_encoding(client):
+    _raw(client, "/versioned", accept_encoding="gzip")
+    response, raw = _raw(client, "/versioned", accept_encoding="identity")
+
+    assert client.renders == [1, 1]
+    assert raw == BODY
+
+
+def test_oversized_bodies_are_not_cached(client, monkeypatch):
+    monkeypatch.setattr(compression.settings, "COMPRESSION_CACHE_MAX_ENTRY_BYTES", 10)
+    _raw(client, "/versioned", accept_encoding="gzip")
+    _raw(client, "/versioned", accept_encoding="gzip")
+
+    assert client.renders == [1, 1]
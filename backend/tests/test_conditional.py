@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+
+from starlette.requests import Request
+
+from app.services import conditional
+
+ETAG = conditional.make_etag("queries", 42)
+MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+def _request(**headers: str) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+def test_make_etag_is_stable_and_quoted():
+    assert ETAG == conditional.make_etag("queries", 42)
+    assert ETAG != conditional.make_etag("queries", 43)
+    assert ETAG.startswith('"') and ETAG.endswith('"') and len(ETAG) == 22
+
+
+def test_etag_matches_uses_weak_comparison():
+    assert conditional._etag_matches(ETAG, ETAG)
+    assert conditional._etag_matches("W/" + ETAG, ETAG)
+    assert conditional._etag_matches(f'"other", W/{ETAG}', ETAG)
+    assert conditional._etag_matches("*", ETAG)
+    assert not conditional._etag_matches('"other"', ETAG)
+
+
+def test_not_modified_on_matching_etag():
+    response = conditional.not_modified(_request(if_none_match="W/" + ETAG), ETAG, MODIFIED)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["last-modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = _request(if_none_match='"other"', if_modified_since="Wed, 01 May 2024 12:30:15 GMT")
+    assert conditional.not_modified(request, ETAG, MODIFIED) is None
+
+
+def test_if_modified_since_has_second_resolution():
+    assert conditional.not_modified(_request(if_modified_since="Wed, 01 May 2024 12:30:15 GMT"), ETAG, MODIFIED)
+    assert conditional.not_modified(_request(if_modified_since="Wed, 01 May 2024 12:30:14 GMT"), ETAG, MODIFIED) is None
+    assert conditional.not_modified(_request(if_modified_since="not a date"), ETAG, MODIFIED) is None
+
+
+def test_no_validators_means_modified():
+    assert conditional.not_modified(_request(), ETAG, MODIFIED) is None
+    assert conditional.not_modified(_request(if_modified_since="Wed, 01 May 2024 12:30:15 GMT"), ETAG) is None
@@ -0,0 +1,27 @@
+from app.config import settings
+from app.services import export_jobs
+
+
+def _job(job_id: str) -> dict:
+    return {"id": job_id, "format": job_id.split("-", 1)[0], "status": "done"}
+
+
+def test_prune_keeps_artifacts_of_newer_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_ARTIFACT_DIR", str(tmp_path))
+    monkeypatch.setattr(export_jobs, "_jobs", {})
+    for job_id in ("pdf-7", "pdf-9", "pdf-12", "csv-3"):
+        export_jobs._jobs[job_id] = _job(job_id)
+        export_jobs.artifact_path(job_id).write_bytes(b"x")
+    (tmp_path / "pdf-0123456789abcdef0123.pdf").write_bytes(b"x")
+    (tmp_path / "pdf-13.pdf.123.tmp").write_bytes(b"x")
+
+    # The render for version 9 finishes after the one for version 12
+    export_jobs._prune("pdf-9")
+
+    assert sorted(export_jobs._jobs) == ["csv-3", "pdf-12", "pdf-9"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "csv-3.csv",
+        "pdf-12.pdf",
+        "pdf-13.pdf.123.tmp",
+        "pdf-9.pdf",
+    ]
@@ -0,0 +1,149 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select, update
+
+from app.database import AsyncSessionLocal
+from app.models.weather_query import WeatherQuery
+from app.services import forecast_refresher, resilience
+from tests.conftest import run
+
+# Far enough in the past that no real row is stale as of NOW
+NOW = datetime(2000, 1, 10, 12, tzinfo=timezone.utc)
+WRITTEN_AT = datetime(2000, 1, 5, 12, tzinfo=timezone.utc)
+START, END = date(2000, 1, 1), date(2000, 1, 8)
+
+
+def _daily(start: date, end: date, value: float) -> dict:
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return {
+        "latitude": 40.0,
+        "longitude": -70.0,
+        "daily": {
+            "time": [d.isoformat() for d in days],
+            "temperature_2m_max": [value] * len(days),
+            "temperature_2m_min": [value - 10] * len(days),
+            "precipitation_sum": [0.0] * len(days),
+            "weathercode": [1] * len(days),
+        },
+    }
+
+
+async def _insert_stale_row() -> int:
+    async with AsyncSessionLocal() as session:
+        row_id = await session.scalar(
+            insert(WeatherQuery)
+            .values(
+                location="refresher test",
+                resolved_location="Refresher Test",
+                latitude=40.0,
+                longitude=-70.0,
+                start_date=START,
+                end_date=END,
+                weather_data=_daily(START, END, 50.0),
+                created_at=WRITTEN_AT,
+                updated_at=WRITTEN_AT,
+            )
+            .returning(WeatherQuery.id)
+        )
+        await session.commit()
+    return row_id
+
+
+async def _delete(*row_ids: int) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(WeatherQuery).where(WeatherQuery.id.in_(row_ids)))
+        await session.commit()
+
+
+def test_refresh_once_patches_unsettled_tail(database, monkeypatch):
+    fetched = []
+
+    async def fake_fetch(lat, lon, start, end):
+        fetched.append((start, end))
+        return _daily(start, end, 80.0)
+
+    monkeypatch.setattr(forecast_refresher, "get_weather_for_range", fake_fetch)
+
+    async def scenario():
+        # Two rows, so the page is written with more than one statement's worth of rows
+        row_ids = [await _insert_stale_row(), await _insert_stale_row()]
+        try:
+            before = forecast_refresher.stats()["patched"]
+            patched = await forecast_refresher.refresh_once(now=NOW)
+            async with AsyncSessionLocal() as session:
+                records = [await session.get(WeatherQuery, row_id) for row_id in row_ids]
+            return patched, before, records
+        finally:
+            await _delete(*row_ids)
+
+    patched, before, records = run(scenario())
+
+    tail_start = max(START, WRITTEN_AT.date() - timedelta(days=forecast_refresher.ARCHIVE_STABLE_DAYS))
+    assert patched == 2
+    assert forecast_refresher.stats()["patched"] == before + 2
+    assert fetched == [(tail_start, END)] * 2
+    split = (tail_start - START).days
+    for record in records:
+        daily = record.weather_data["daily"]
+        assert daily["time"] == _daily(START, END, 0)["daily"]["time"]
+        assert daily["temperature_2m_max"] == [50.0] * split + [80.0] * (len(daily["time"]) - split)
+        assert record.temp_max == 80.0
+        assert record.updated_at > WRITTEN_AT
+
+
+def test_refresh_once_skips_rows_edited_during_fetch(database, monkeypatch):
+    row_ids = []
+
+    async def fetch_while_edited(lat, lon, start, end):
+        # A user edit lands between the read and the write-back
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(WeatherQuery).where(WeatherQuery.id == row_ids[0]).values(location="edited")
+            )
+            await session.commit()
+        return _daily(start, end, 80.0)
+
+    monkeypatch.setattr(forecast_refresher, "get_weather_for_range", fetch_while_edited)
+
+    async def scenario():
+        row_ids.append(await _insert_stale_row())
+        try:
+            patched = await forecast_refresher.refresh_once(now=NOW)
+            async with AsyncSessionLocal() as session:
+                weather_data = await session.scalar(
+                    select(WeatherQuery.weather_data).where(WeatherQuery.id == row_ids[0])
+                )
+            return patched, weather_data
+        finally:
+            await _delete(row_ids[0])
+
+    patched, weather_data = run(scenario())
+
+    assert patched == 0
+    assert weather_data["daily"]["temperature_2m_max"] == [50.0] * 8
+
+
+def test_refresh_once_skips_stale_fallbacks(database, monkeypatch):
+    async def fallback_fetch(lat, lon, start, end):
+        resilience.report_fallbacks(("open_meteo",))
+        return _daily(start, end, 80.0)
+
+    monkeypatch.setattr(forecast_refresher, "get_weather_for_range", fallback_fetch)
+
+    async def scenario():
+        row_id = await _insert_stale_row()
+        try:
+            before = forecast_refresher.stats()["stale"]
+            patched = await forecast_refresher.refresh_once(now=NOW)
+            async with AsyncSessionLocal() as session:
+                record = await session.get(WeatherQuery, row_id)
+            return patched, before, record
+        finally:
+            await _delete(row_id)
+
+    patched, before, record = run(scenario())
+
+    assert patched == 0
+    assert forecast_refresher.stats()["stale"] == before + 1
+    assert record.weather_data["daily"]["temperature_2m_max"] == [50.0] * 8
+    assert record.updated_at == WRITTEN_AT
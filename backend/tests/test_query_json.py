@@ -0,0 +1,79 @@
+import json
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, insert, select
+
+from app.database import AsyncSessionLocal
+from app.models.weather_query import WeatherQuery
+from app.schemas.weather_query import WeatherQueryResponse
+from app.services.query_json import RESPONSE_JSON
+from tests.conftest import run
+
+ROWS = [
+    # Whole-second timestamps, which pydantic writes without a fraction
+    {
+        "latitude": 40.7128,
+        "longitude": -74.0,
+        "temp_min": 30.0,
+        "temp_max": 51.5,
+        "precipitation_total": 0.1,
+        "day_count": 2,
+        "created_at": datetime(2000, 1, 5, 12, tzinfo=timezone.utc),
+        "updated_at": datetime(2000, 1, 5, 12, 0, 1, tzinfo=timezone.utc),
+    },
+    # Sub-second timestamps, one with leading zeros in the fraction, and NULL aggregates
+    {
+        "latitude": None,
+        "longitude": None,
+        "temp_min": None,
+        "temp_max": None,
+        "precipitation_total": None,
+        "day_count": 0,
+        "created_at": datetime(2000, 1, 5, 12, 0, 0, 500000, tzinfo=timezone.utc),
+        "updated_at": datetime(2000, 1, 5, 12, 0, 0, 123, tzinfo=timezone.utc),
+    },
+]
+
+
+def test_response_json_matches_response_model(database):
+    weather_data = {"latitude": 40.7, "daily": {"time": ["2000-01-01", "2000-01-02"], "weathercode": [1, 3]}}
+
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            row_ids = [
+                await session.scalar(
+                    insert(WeatherQuery)
+                    .values(
+                        location="json test",
+                        resolved_location="JSON Test",
+                        start_date=date(2000, 1, 1),
+                        end_date=date(2000, 1, 2),
+                        weather_data=weather_data,
+                        **values,
+                    )
+                    .returning(WeatherQuery.id)
+                )
+                for values in ROWS
+            ]
+            await session.commit()
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(WeatherQuery, RESPONSE_JSON).where(WeatherQuery.id.in_(row_ids)).order_by(WeatherQuery.id)
+                )
+                return [
+                    (WeatherQueryResponse.model_validate(record).model_dump_json(), built)
+                    for record, built in result
+                ]
+        finally:
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(WeatherQuery).where(WeatherQuery.id.in_(row_ids)))
+                await session.commit()
+
+    pairs = run(scenario())
+
+    assert len(pairs) == len(ROWS)
+    for expected, built in pairs:
+        # Whitespace differs (json_build_object pads separators); values, including the
+        # exact timestamp strings, must not
+        assert json.loads(built) == json.loads(expected)
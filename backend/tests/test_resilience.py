@@ -0,0 +1,135 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.config import settings
+from app.services import open_meteo, resilience, singleflight
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(settings, "BREAKER_WINDOW_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "BREAKER_MIN_REQUESTS", 4)
+    monkeypatch.setattr(settings, "BREAKER_ERROR_RATE", 0.5)
+    monkeypatch.setattr(settings, "BREAKER_OPEN_SECONDS", 15.0)
+    return now
+
+
+def test_breaker_opens_at_error_rate_after_min_requests(clock):
+    breaker = CircuitBreaker("test")
+    for ok in (False, False, True):
+        breaker.record(ok)
+    assert breaker.state == CLOSED
+
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_forgets_outcomes_outside_the_window(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(3):
+        breaker.record(False)
+    clock[0] += 31
+    breaker.record(False)
+    assert breaker.state == CLOSED
+    assert breaker.error_rate() == 1.0
+
+
+def test_breaker_half_open_allows_one_probe(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(4):
+        breaker.record(False)
+    clock[0] += 15
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock[0] += 15
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    assert breaker.error_rate() == 0.0
+
+
+def test_breaker_release_probe_lets_another_probe_through(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(4):
+        breaker.record(False)
+    clock[0] += 15
+    assert breaker.allow()
+
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+def test_coalesced_callers_all_see_fallbacks():
+    release = asyncio.Event()
+
+    @singleflight.coalesce
+    async def lookup(key: str) -> str:
+        await release.wait()
+        resilience.report_fallbacks(("upstream",))
+        return key.upper()
+
+    async def caller():
+        with resilience.track_fallbacks() as stale:
+            result = await lookup("k")
+        return result, stale
+
+    async def main():
+        callers = [asyncio.create_task(caller()) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(*callers)
+
+    assert asyncio.run(main()) == [("K", {"upstream"})] * 3
+
+
+def test_fallback_days_are_not_cached_or_stored(monkeypatch):
+    saved = {}
+
+    async def load_days(lat, lon, start, end):
+        return {}
+
+    async def save_days(lat, lon, days):
+        saved.update(days)
+
+    async def fetch(url, lat, lon, start, end, variables):
+        payload = {
+            "latitude": lat,
+            "daily": {
+                "time": [start.isoformat()],
+                "temperature_2m_max": [50.0],
+                "temperature_2m_min": [40.0],
+                "weathercode": [1],
+                "precipitation_sum": [0.0],
+            },
+        }
+        return payload, True
+
+    monkeypatch.setattr(open_meteo.weather_store, "load_days", load_days)
+    monkeypatch.setattr(open_meteo.weather_store, "save_days", save_days)
+    monkeypatch.setattr(open_meteo._batcher, "fetch", fetch)
+    monkeypatch.setattr(open_meteo, "_day_cache", open_meteo.TTLCache(max_entries=10, ttl=None))
+
+    async def main():
+        with resilience.track_fallbacks() as stale:
+            data = await open_meteo.get_weather_for_range(40.0, -70.0, date(2000, 1, 1), date(2000, 1, 1))
+        return data, stale
+
+    data, stale = asyncio.run(main())
+
+    assert data["daily"]["temperature_2m_max"] == [50.0]
+    assert stale == {"open_meteo"}
+    assert saved == {}
+    assert len(open_meteo._day_cache) == 0
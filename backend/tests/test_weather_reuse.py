@@ -0,0 +1,59 @@
+from datetime import date
+
+from sqlalchemy import delete, insert
+
+from app.database import AsyncSessionLocal
+from app.models.weather_query import WeatherQuery
+from app.services import geohash
+from app.services.weather_reuse import find_nearby_weather
+from tests.conftest import run
+
+START, END = date(2000, 1, 1), date(2000, 1, 3)
+
+# Just north of the 40.05 boundary between grid cells 40.0 and 40.1
+DONOR = (40.0501, -70.0)
+
+
+def _weather(lat: float, lon: float) -> dict:
+    days = ["2000-01-01", "2000-01-02", "2000-01-03"]
+    return {"latitude": lat, "longitude": lon, "daily": {"time": days, "temperature_2m_max": [1.0, 2.0, 3.0]}}
+
+
+def _lookup(lat: float, lon: float) -> dict | None:
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            row_id = await session.scalar(
+                insert(WeatherQuery)
+                .values(
+                    location="reuse test",
+                    latitude=DONOR[0],
+                    longitude=DONOR[1],
+                    geohash=geohash.encode(*DONOR),
+                    start_date=START,
+                    end_date=END,
+                    weather_data=_weather(40.08, -70.02),
+                )
+                .returning(WeatherQuery.id)
+            )
+            await session.commit()
+        try:
+            async with AsyncSessionLocal() as session:
+                return await find_nearby_weather(session, lat, lon, START, date(2000, 1, 2))
+        finally:
+            async with AsyncSessionLocal() as session:
+                await session.execute(delete(WeatherQuery).where(WeatherQuery.id == row_id))
+                await session.commit()
+
+    return run(scenario())
+
+
+def test_reuses_query_in_the_same_grid_cell(database):
+    reused = _lookup(40.09, -70.01)
+
+    assert reused["daily"]["temperature_2m_max"] == [1.0, 2.0]
+    assert (reused["latitude"], reused["longitude"]) == (40.1, -70.0)
+
+
+def test_skips_nearby_query_in_another_grid_cell(database):
+    # About 100 m away, well inside the reuse radius, but in the 40.0 cell
+    assert _lookup(40.0492, -70.0) is None